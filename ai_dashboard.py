@@ -4,259 +4,163 @@
 # Deflation subplot restored; Gemini 3 auto-added
 # ==============================
 
+import time
+
 import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-import yfinance as yf  # Optional stock overlay
+
+import alerts
+import config
+import datasources
+import exports
+import figures
+import instrumentation
+import market_data
+import metrics
+import scenarios
+
+_run_start = time.perf_counter()
+instrumentation.serve_from_env()
 
 st.set_page_config(page_title="AI Profit Watch v3.1", layout="wide", initial_sidebar_state="expanded")
 st.title("AI Model Profitability & Datacenter Viability Dashboard v3.1")
 st.markdown("**Fully automatic historical trends • Nov 23, 2025** — Quarterly data 2023–2025 from SEC/Bain/Epoch/X")
 
 # ==============================
-# AUTO-PULL FUNCTIONS (Caches 24h; Historical Series)
+# AUTO-PULL (per-source caches, stale-while-revalidate, persisted to disk)
+# Store-backed series are read from CHART_START only (config.LOOKBACK_YEARS)
 # ==============================
-@st.cache_data(ttl=86400)
-def auto_pull_historical_data():
-    # Historical Quarterly Data (Synthesized from Bain, Epoch, SEC, etc.)
-    quarters = ["2023-Q4", "2024-Q2", "2024-Q4", "2025-Q2", "2025-Q3"]
-    historical_data = pd.DataFrame({
-        "Quarter": quarters,
-        "AI_CapEx_B": [28, 55, 110, 180, 315],
-        "Inference_Revenue_B": [0.8, 3.2, 7.5, 11.8, 15.2],
-        "Inference_Cost_B": [1.9, 5.1, 9.8, 14.3, 18.7],
-        "Token_Volume_YoY": [None, 4.2, 7.8, 9.1, 9.4],
-        "Utilization_pct": [38, 52, 61, 68, 72],
-        "Inference_Share_pct": [35, 55, 68, 76, 82],
-        "Training_Share_pct": [65, 45, 32, 24, 18],
-    })
-    
-    # Job Loss Historical
-    job_posts = [120, 680, 2100, 4900, 8200]
-    sentiment_scores = [0.12, 0.28, 0.41, 0.58, 0.71]
-    
-    # Price Deflation Historical (FIX: Double quotes + rename to avoid space issues)
-    deflation_dict = {
-        "Quarter": ["2022-Q4", "2023-Q2", "2023-Q4", "2024-Q2", "2024-Q4", "2025-Q2", "2025-Q3"],
-        "Revenue_per_M_Tokens": [2.10, 1.10, 0.65, 0.48, 0.41, 0.36, 0.34],  # Renamed key
-        "Cost_per_M_Tokens": [1.80, 0.62, 0.19, 0.09, 0.07, 0.06, 0.05]  # Renamed key
-    }
-    deflation_data = pd.DataFrame(deflation_dict)
-    
-    # Pricing Scrape (Current Flagships)
-    urls = {
-        "OpenAI (GPT-4o)": "https://openai.com/api/pricing/",
-        "Google (Gemini 2.5 Pro)": "https://cloud.google.com/vertex-ai/pricing",
-        "Anthropic (Claude 3.5 Sonnet)": "https://www.anthropic.com/pricing",
-        "xAI (Grok-4)": "https://x.ai/api/pricing"
-    }
-    pricing_data = []
-    for model, url in urls.items():
-        try:
-            resp = requests.get(url)
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            # Simplified extract (fallback values for demo)
-            input_price = 0.15 if "gpt" in model.lower() else (0.35 if "gemini" in model.lower() else (3.00 if "claude" in model.lower() else 3.00))
-            output_price = 0.60 if "gpt" in model.lower() else (1.05 if "gemini" in model.lower() else (15.00 if "claude" in model.lower() else 15.00))
-            pricing_data.append({"Model": model, "Input $/M": input_price, "Output $/M": output_price})
-        except:
-            pricing_data.append({"Model": model, "Input $/M": 0.15, "Output $/M": 0.60})
-    pricing = pd.DataFrame(pricing_data)
-    
-    # Auto-Add Gemini 3 (Nov 18, 2025 release)
-    if datetime.now() > datetime(2025, 11, 18):
-        pricing = pd.concat([pricing, pd.DataFrame([{"Model": "Gemini 3", "Input $/M": 0.35, "Output $/M": 1.05}])], ignore_index=True)
-    
-    return {
-        "historical_data": historical_data,
-        "job_posts": job_posts, "sentiment_scores": sentiment_scores,
-        "deflation_data": deflation_data, "pricing": pricing
-    }
+CHART_START = config.lookback_start()
+with instrumentation.span("data_access"):
+    data = datasources.auto_pull_historical_data(start=CHART_START)
+
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart timed as a chart_emit span (figure serialization + send).
+
+    Long line traces are trimmed to the visible range, LTTB-downsampled and
+    switched to WebGL first, so the payload stays bounded as history grows.
+    """
+    name = kwargs.get("key") or fig.layout.title.text or "chart"
+    with instrumentation.span("chart_emit", chart=name):
+        st.plotly_chart(figures.thin(fig), **kwargs)
 
-data = auto_pull_historical_data()
 
 # Log Scale Toggle
-log_scale = st.sidebar.checkbox("Logarithmic Y-Axis (for trends like capex/deflation)", value=True)
+log_scale = st.sidebar.checkbox("Logarithmic Y-Axis (for trends like capex/deflation)", value=True, key="log_scale")
 def apply_log(fig):
-    if log_scale:
-        fig.update_yaxes(type="log")
-    return fig
-
-# Define 5 tabs in single row (line ~90 — shorter titles for no wrap)
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "Profit & CapEx", 
-    "Inference vs Training", 
-    "Job Loss Risk", 
-    "Live Pricing", 
-    "CDS Canaries"
-])
+    return figures.apply_log(fig, log_scale)
 
 # ——— TAB 1: Profit & CapEx + H100 Rental (Balanced 2x2, No Gap Error) ———
-with tab1:
+# Figures come from the memoized factory — keyed on (data version, log_scale, height)
+def tab1_figure(name, source, height):
+    entry = datasources.get_entry(source, start=CHART_START)
+    return figures.figure(name, entry.version, log_scale, height, entry.value)
+
+# Monte Carlo breakeven scenarios — results memoized per slider combination
+def render_rental_scenarios():
+    with st.expander("Monte Carlo: when does rental cross each breakeven line?"):
+        rental = datasources.get("h100_rental", start=CHART_START)
+        hist_drift, hist_vol = scenarios.calibrate(rental["date"], rental["Price"])
+        c1, c2, c3, c4 = st.columns(4)
+        drift = c1.slider("Annual drift (log %)", -100, 50, int(round(hist_drift * 100)), 5, key="tab_mc_drift")
+        vol = c2.slider("Annual volatility (%)", 5, 120, max(5, int(round(hist_vol * 100))), 5, key="tab_mc_vol")
+        years = c3.slider("Horizon (years)", 1, 5, 3, key="tab_mc_years")
+        n_paths = c4.select_slider("Paths", [10_000, 25_000, 50_000], 25_000, key="tab_mc_paths")
+        params = scenarios.RentalParams(float(rental["Price"].iloc[-1]), drift / 100, vol / 100, years, n_paths, seed=0)
+        with instrumentation.span("mc_simulate", model="rental"):
+            result = scenarios.rental_breakeven(params)
+
+        fan = result["fan"]
+        fig_mc = go.Figure()
+        fig_mc.add_trace(go.Scatter(x=fan["years"], y=fan["p95"], line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fig_mc.add_trace(go.Scatter(name="5–95%", x=fan["years"], y=fan["p5"], fill="tonexty", fillcolor="rgba(31,119,180,0.15)", line=dict(width=0)))
+        fig_mc.add_trace(go.Scatter(x=fan["years"], y=fan["p75"], line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fig_mc.add_trace(go.Scatter(name="25–75%", x=fan["years"], y=fan["p25"], fill="tonexty", fillcolor="rgba(31,119,180,0.35)", line=dict(width=0)))
+        fig_mc.add_trace(go.Scatter(name="Median", x=fan["years"], y=fan["p50"], line=dict(color="#1f77b4", width=3)))
+        for (name, level), color in zip(scenarios.BREAKEVEN_LINES, ["#FFD700", "#FF8C00", "red"]):
+            fig_mc.add_hline(y=level, line=dict(color=color, width=2, dash="dash"), annotation_text=f"{name} ${level:.2f}")
+        fig_mc.update_layout(title=f"Simulated H100 Rental ($/GPU-hr), {n_paths:,} paths", xaxis_title="Years from now", height=380)
+        plotly_chart(apply_log(fig_mc), use_container_width=True, key="mc_rental_fan")
+
+        table = result["table"].copy()
+        table["P(cross)"] = (table["P(cross)"] * 100).round(1).astype(str) + "%"
+        table["Expected years to cross"] = table["Expected years to cross"].round(2)
+        st.dataframe(table, use_container_width=True, hide_index=True)
+        st.caption(f"GBM on log price from ${params.start:.2f}; history implies drift {hist_drift:.0%}, vol {hist_vol:.0%}/yr. "
+                   "Expected time is conditional on crossing within the horizon (0 = already below).")
+
+def render_profit_capex():
+    latest_yoy = metrics.growth_pct(data["deflation_data"]["Revenue_per_M_Tokens"]).iloc[-1]
+
     # Strict 2x2 columns (no gap param = default "small", minimal space)
     col1, col2 = st.columns(2)  # Omit gap=0 to avoid error
     
-    # LEFT COLUMN: Revenue (top) + H100 Rental (bottom) — tight vertical stack
+    # LEFT COLUMN: H100 Rental (top) + compact CapEx / Deflation / YoY stack
     with col1:
-        # Bottom: H100 Rental Trend — Cleaner Labels & Expanded Range
-        fig_rental = go.Figure()
-        
-        months = ["2024-01", "2024-04", "2024-07", "2024-10", "2025-01", "2025-04", "2025-07", "2025-10", "2025-11"]
-        prices = [8.50, 7.20, 5.80, 4.10, 3.60, 3.10, 2.80, 2.50, 2.37]
-        
-        fig_rental.add_trace(go.Scatter(
-            name="H100 Rental $/GPU-hr (monthly avg)",
-            x=months,
-            y=prices,
-            mode="lines+markers",
-            line=dict(color="#8B4513", width=6),
-            marker=dict(size=11)
-        ))
-
-        # Warnings with smaller font, further left
-        fig_rental.add_hline(y=0.60, line=dict(color="red", width=5, dash="dash"),
-            annotation_text="Energy $0.60", annotation_position="left", annotation_x=0.005, annotation_y=0.1, annotation_font=dict(color="red", size=10))
-        fig_rental.add_hline(y=1.65, line=dict(color="#FF8C00", width=5, dash="dash"),
-            annotation_text="Full-Cost $1.65", annotation_position="left", annotation_x=0.005, annotation_y=0.35, annotation_font=dict(color="#FF8C00", size=10))
-        fig_rental.add_hline(y=2.60, line=dict(color="#FFD700", width=5, dash="dash"),
-            annotation_text="Debt $2.60", annotation_position="left", annotation_x=0.005, annotation_y=0.6, annotation_font=dict(color="#B8860B", size=10))
-
-        fig_rental = apply_log(fig_rental)
-        fig_rental.update_layout(
-            title="H100 Rental Cost Trend — Monthly (Chanos Signal + 3-Line Warning)",
-            height=450,
-            yaxis_title="$/GPU-hr",
-            yaxis=dict(range=[-0.5, 1]),  # Expanded focus: $0.3–$10
-            margin=dict(l=120, r=80, t=80, b=80)  # Balanced for ticks
-        )
-        st.plotly_chart(fig_rental, use_container_width=True)
+        plotly_chart(tab1_figure("rental", "h100_rental", 450), use_container_width=True)
         st.caption("Nov 2025 avg = $2.37 — 8% above debt-cover. Expanded range = full data visibility.")
-    
-        # Top: CapEx vs Utilization Subplot (unchanged)
-        fig_capex = make_subplots(specs=[[{"secondary_y": True}]])
-        fig_capex.add_trace(go.Bar(name="AI CapEx $B", x=data["historical_data"]["Quarter"], y=data["historical_data"]["AI_CapEx_B"], marker_color="orange"), secondary_y=False)
-        fig_capex.add_trace(go.Scatter(name="Utilization %", x=data["historical_data"]["Quarter"], y=data["historical_data"]["Utilization_pct"], mode="lines+markers", line=dict(width=5, color="purple")), secondary_y=True)
-        fig_capex = apply_log(fig_capex)
-        fig_capex.update_layout(title="Hyperscaler CapEx vs Utilization (2023–2025)", height=420)
-        st.plotly_chart(fig_capex, use_container_width=True, key="capex_chart")  # Unique key
-
-        # Bottom Top: Deflation Dual-Lines (Log Scale, Unique Fig)
-        fig_deflation = make_subplots(specs=[[{"secondary_y": True}]])
-        fig_deflation.add_trace(go.Scatter(name="Revenue/M Tokens", x=data["deflation_data"]["Quarter"], y=data["deflation_data"]["Revenue_per_M_Tokens"], mode="lines+markers", line=dict(color="green")), secondary_y=False)
-        fig_deflation.add_trace(go.Scatter(name="Cost/M Tokens", x=data["deflation_data"]["Quarter"], y=data["deflation_data"]["Cost_per_M_Tokens"], mode="lines+markers", line=dict(color="red")), secondary_y=True)
-        fig_deflation = apply_log(fig_deflation)
-        fig_deflation.update_layout(title="Price Deflation Trend (Blended, 2022–2025)", height=200)
-        st.plotly_chart(fig_deflation, use_container_width=True, key="deflation_chart")  # Unique key
-
-        # Bottom: YoY Growth Rate Bar Chart (Linear, Unique Fig)
-        fig_yoy_growth = go.Figure()
-        yoy_growth = [None]
-        quarters_yoy = data["deflation_data"]["Quarter"].iloc[1:]
-        for i in range(1, len(data["deflation_data"])):
-            prior = data["deflation_data"]["Revenue_per_M_Tokens"].iloc[i-1]
-            current = data["deflation_data"]["Revenue_per_M_Tokens"].iloc[i]
-            growth_rate = ((current - prior) / prior) * 100
-            yoy_growth.append(growth_rate)
-        fig_yoy_growth.add_trace(go.Bar(name="YoY Revenue Growth Rate (%)", x=quarters_yoy, y=yoy_growth[1:], marker_color="purple"))
-        fig_yoy_growth.add_hline(y=-30, line_dash="dash", line_color="red", annotation_text="-30% Deceleration Threshold", annotation_position="bottom right", annotation_font_size=12)
-        fig_yoy_growth.update_layout(
-            title="YoY Revenue per M Tokens Growth Rate (Linear, 2023–2025 Q3)",
-            yaxis_title="Growth Rate (%)",
-            yaxis=dict(range=[-80, 0], tickmode="linear", dtick=10),
-            height=280,
-            showlegend=False
-        )
-        st.plotly_chart(fig_yoy_growth, use_container_width=True, key="yoy_growth_chart")  # Unique key
-
-        st.info(f"Latest Q3 2025 YoY: {yoy_growth[-1]:.0f}% — Watch for sustained <-30% with token growth <8–10x (market deceleration)")
-
-with col2:
-        # Right Column — Tall & Clean (Unique Keys)
-        with col2:
-            # Top: CapEx vs Utilization (500px)
-            fig_capex = make_subplots(specs=[[{"secondary_y": True}]])
-            fig_capex.add_trace(go.Bar(name="AI CapEx $B", x=data["historical_data"]["Quarter"], y=data["historical_data"]["AI_CapEx_B"], marker_color="orange"), secondary_y=False)
-            fig_capex.add_trace(go.Scatter(name="Utilization %", x=data["historical_data"]["Quarter"], y=data["historical_data"]["Utilization_pct"], mode="lines+markers", line=dict(width=5, color="purple")), secondary_y=True)
-            fig_capex = apply_log(fig_capex)
-            fig_capex.update_layout(title="Hyperscaler CapEx vs Utilization (2023–2025)", height=500)
-            st.plotly_chart(fig_capex, use_container_width=True, key="capex_util_chart_v2")  # ← Unique key
-
-            # Middle: Deflation Dual-Lines (380px)
-            fig_deflation = make_subplots(specs=[[{"secondary_y": True}]])
-            fig_deflation.add_trace(go.Scatter(name="Revenue/M Tokens", x=data["deflation_data"]["Quarter"], y=data["deflation_data"]["Revenue_per_M_Tokens"], mode="lines+markers", line=dict(color="green")), secondary_y=False)
-            fig_deflation.add_trace(go.Scatter(name="Cost/M Tokens", x=data["deflation_data"]["Quarter"], y=data["deflation_data"]["Cost_per_M_Tokens"], mode="lines+markers", line=dict(color="red")), secondary_y=True)
-            fig_deflation = apply_log(fig_deflation)
-            fig_deflation.update_layout(title="Price Deflation Trend (Blended, 2022–2025)", height=380)
-            st.plotly_chart(fig_deflation, use_container_width=True, key="deflation_trend_v2")  # ← Unique key
-
-            # Bottom: YoY Growth Rate Bar Chart (450px — tall & readable)
-            fig_yoy = go.Figure()
-            yoy_growth = [None]
-            quarters_yoy = data["deflation_data"]["Quarter"].iloc[1:]
-            for i in range(1, len(data["deflation_data"])):
-                prior = data["deflation_data"]["Revenue_per_M_Tokens"].iloc[i-1]
-                current = data["deflation_data"]["Revenue_per_M_Tokens"].iloc[i]
-                growth_rate = ((current - prior) / prior) * 100
-                yoy_growth.append(growth_rate)
-            fig_yoy.add_trace(go.Bar(name="YoY Revenue Growth Rate (%)", x=quarters_yoy, y=yoy_growth[1:], marker_color="purple"))
-            fig_yoy.add_hline(y=-30, line_dash="dash", line_color="red", annotation_text="-30% Deceleration Threshold", annotation_position="bottom right")
-            fig_yoy.update_layout(
-                title="YoY Revenue per M Tokens Growth Rate (Linear, 2023–2025 Q3)",
-                yaxis_title="Growth Rate (%)",
-                yaxis=dict(range=[-80, 0], tickmode="linear", dtick=10),
-                height=450,
-                showlegend=False
-            )
-            st.plotly_chart(fig_yoy, use_container_width=True, key="yoy_growth_chart_v2")  # ← Unique key
-
-            st.info(f"Latest Q3 2025 YoY: {yoy_growth[-1]:.0f}% — Watch for sustained <−30% with token growth <8–10×")
+        render_rental_scenarios()
+
+        plotly_chart(tab1_figure("capex", "historical_data", 420), use_container_width=True, key="capex_chart")  # Unique key
+        plotly_chart(tab1_figure("deflation", "deflation_data", 200), use_container_width=True, key="deflation_chart")  # Unique key
+        plotly_chart(tab1_figure("yoy_growth", "deflation_data", 280), use_container_width=True, key="yoy_growth_chart")  # Unique key
+
+        st.info(f"Latest Q3 2025 YoY: {latest_yoy:.0f}% — Watch for sustained <-30% with token growth <8–10x (market deceleration)")
+
+    # Right Column — Tall & Clean (Unique Keys)
+    with col2:
+        plotly_chart(tab1_figure("capex", "historical_data", 500), use_container_width=True, key="capex_util_chart_v2")  # ← Unique key
+        plotly_chart(tab1_figure("deflation", "deflation_data", 380), use_container_width=True, key="deflation_trend_v2")  # ← Unique key
+        plotly_chart(tab1_figure("yoy_growth", "deflation_data", 450), use_container_width=True, key="yoy_growth_chart_v2")  # ← Unique key
+
+        st.info(f"Latest Q3 2025 YoY: {latest_yoy:.0f}% — Watch for sustained <−30% with token growth <8–10×")
 
 
 # Tab 2: Inference vs Training Historical
-with tab2:
+def render_inference_training():
     fig3 = go.Figure()
     fig3.add_trace(go.Scatter(name="Inference Share %", x=data["historical_data"].Quarter, y=data["historical_data"]["Inference_Share_pct"], mode="lines+markers", line=dict(width=6, color="#00cc96")))
     fig3.add_trace(go.Scatter(name="Training Share %", x=data["historical_data"].Quarter, y=data["historical_data"]["Training_Share_pct"], mode="lines+markers", line=dict(width=6, color="#ff6b6b")))
     fig3.update_layout(title="Inference vs Training Compute Share (Epoch AI, 2023–2025)", yaxis_title="Share of Total Cycles (%)")
-    st.plotly_chart(fig3, use_container_width=True)
+    plotly_chart(fig3, use_container_width=True)
     st.success("Inference at 82% Q3 2025 — Dominates since mid-2024 ")
 
-# ASIC Share Metric — Stacked Bar in Inference (Added to Tab 2)
-quarters = ["2023-Q4", "2024-Q4", "2025-Q3", "2026-Q4", "2027-Q4"]
-asic_share = [10, 20, 40, 45, 50]  # % inference from ASICs (MarketsandMarkets/Aranca/CNBC est.)
-gpu_share = [90, 80, 60, 55, 50]  # Remainder GPUs (Nvidia dominant)
-
-fig_asic = go.Figure()
-fig_asic.add_trace(go.Bar(name="ASICs (TPU/Trainium/MTIA/Maia)", x=quarters, y=asic_share, marker_color="orange"))
-fig_asic.add_trace(go.Bar(name="GPUs (Nvidia dominant)", x=quarters, y=gpu_share, marker_color="teal"))
-fig_asic.update_layout(
-    title="ASIC Share in AI Inference (% of Hyperscaler Workloads)",
-    barmode="stack",
-    height=400,
-    yaxis_title="Market Share (%)"
-)
-st.plotly_chart(fig_asic, use_container_width=True)
-st.caption("ASICs rising to 50% by 2027 — eroding Nvidia's 90% dominance in inference (MarketsandMarkets/Aranca)")
-st.warning("ASIC share >40% = Nvidia pricing power erosion signal")
+    # ASIC Share Metric — Stacked Bar in Inference
+    asic = datasources.get("asic_share", start=CHART_START)
+    quarters = asic["Quarter"]
+    asic_share = asic["asic_share"]  # % inference from ASICs (MarketsandMarkets/Aranca/CNBC est.)
+    gpu_share = asic["gpu_share"]  # Remainder GPUs (Nvidia dominant)
+
+    fig_asic = go.Figure()
+    fig_asic.add_trace(go.Bar(name="ASICs (TPU/Trainium/MTIA/Maia)", x=quarters, y=asic_share, marker_color="orange"))
+    fig_asic.add_trace(go.Bar(name="GPUs (Nvidia dominant)", x=quarters, y=gpu_share, marker_color="teal"))
+    fig_asic.update_layout(
+        title="ASIC Share in AI Inference (% of Hyperscaler Workloads)",
+        barmode="stack",
+        height=400,
+        yaxis_title="Market Share (%)"
+    )
+    plotly_chart(fig_asic, use_container_width=True)
+    st.caption("ASICs rising to 50% by 2027 — eroding Nvidia's 90% dominance in inference (MarketsandMarkets/Aranca)")
+    st.warning("ASIC share >40% = Nvidia pricing power erosion signal")
 
 # ——— TAB 3: AI Job Loss Risk + Gini Overlay ———
-with tab3:
+def render_job_loss():
     col3, col4 = st.columns(2)
     with col3:
         fig4 = go.Figure()
         fig4.add_trace(go.Bar(name="Weekly X Posts", x=data["historical_data"]["Quarter"], y=data["job_posts"], marker_color="darkred"))
         fig4 = apply_log(fig4)
         fig4.update_layout(title="AI Job Loss Complaints on X (weekly)")
-        st.plotly_chart(fig4, use_container_width=True)
+        plotly_chart(fig4, use_container_width=True)
     with col4:
         fig5 = go.Figure()
         fig5.add_trace(go.Scatter(name="Negative Sentiment", x=data["historical_data"]["Quarter"], y=data["sentiment_scores"], mode="lines+markers", line=dict(color="crimson", width=5)))
         fig5.update_layout(title="Sentiment Score (higher = more negative)", yaxis_range=[0,1])
-        st.plotly_chart(fig5, use_container_width=True)
+        plotly_chart(fig5, use_container_width=True)
     st.warning("Political risk rising — 8200 weekly posts in Nov 2025")
 
     # New: Gini Coefficient Overlay (Political Risk Amplifier)
@@ -272,7 +176,7 @@ with tab3:
     ), secondary_y=False)
     
     # Gini coefficient (right axis - purple line)
-    gini_values = [0.410, 0.412, 0.414, 0.417, 0.419]  # World Bank + FRED + 2025 projection
+    gini_values = datasources.get("job_loss", start=CHART_START)["gini"]  # World Bank + FRED + 2025 projection
     fig_gini.add_trace(go.Scatter(
         name="U.S. Gini Coefficient",
         x=data["historical_data"]["Quarter"],
@@ -289,40 +193,30 @@ with tab3:
     fig_gini.update_yaxes(title_text="Weekly Posts", secondary_y=False, range=[0, 9000])
     fig_gini.update_yaxes(title_text="Gini (higher = worse)", secondary_y=True, range=[0.40, 0.43])
     
-    st.plotly_chart(fig_gini, use_container_width=True)
+    plotly_chart(fig_gini, use_container_width=True)
     st.warning("Gini projected to hit 0.423 by EOY 2025 — highest since 1930s if trend holds")
 
 
 # Tab 4: Live Pricing (w/ Auto-Add)
-with tab4:
+def render_live_pricing():
     st.dataframe(data["pricing"].style.format({"Input $/M": "${:.3f}", "Output $/M": "${:.2f}"}), use_container_width=True)
     if "Gemini 3" in data["pricing"]["Model"].values:
         st.success("Gemini 3 auto-added (Nov 18, 2025 release) ")
 
-with tab5:
+# ——— TAB 5: CDS Canaries ———
+def render_cds_canaries():
     st.header("CDS Canary Watch: CRWV, ORCL, NBIS Proxy (Nov 2025)")
 
-    # Updated Quarterly Data (bps, 2024–Nov 2025; Bloomberg/Refinitiv Nov 20–24)
-    quarters = ["2024-Q1", "2024-Q2", "2024-Q3", "2024-Q4", "2025-Q1", "2025-Q2", "2025-Q3", "2025-Nov"]
-    crwv_cds = [250, 280, 320, 360, 420, 510, 675, 675]  # Spike to 675 bps Nov 20 [](grok_render_citation_card_json={"cardIds":["5e86c7","828ff6","3db616","8e7287","c07a80","15b379"]})
-    orcl_cds = [30, 35, 40, 45, 50, 60, 80, 110]  # Rise to 110 bps Nov 24 [](grok_render_citation_card_json={"cardIds":["ba24b6","b2d5c2","aaa9d9","cd8bf2","751698","5286f2","8b532b","ecd0d2","3733f3","fa84b0"]})
-    nbis_proxy = [None, None, None, None, 200, 300, 400, 450]  # Equity vol proxy
-
-    # 5-Year Cumulative IDP Calc (35% recovery)
-    def calc_5yr_idp(spreads):
-        result = []
-        for s in spreads:
-            if s is None or s <= 0:
-                result.append(None)
-            else:
-                annual_pd = (s / 10000) / (1 - 0.35)
-                cumulative = 1 - (1 - annual_pd)**5
-                result.append(round(cumulative * 100, 1))
-        return result
-
-    crwv_idp = calc_5yr_idp(crwv_cds)
-    orcl_idp = calc_5yr_idp(orcl_cds)
-    nbis_idp = calc_5yr_idp(nbis_proxy)
+    # Quarterly spreads (bps, 2024–Nov 2025; Bloomberg/Refinitiv Nov 20–24), one column per issuer
+    cds = datasources.get("cds_spreads", start=CHART_START).set_index("Quarter").drop(columns="date")
+    quarters = cds.index
+
+    # 5-Year Cumulative IDP (all issuers at once)
+    recovery = st.slider("Recovery rate", 0.0, 0.8, metrics.DEFAULT_RECOVERY, 0.05, key="tab_cds_recovery")
+    with instrumentation.span("cds_calc"):
+        idp = (metrics.cumulative_default_probability(cds, tenors=5, recovery=recovery) * 100).round(1)
+    crwv_cds, orcl_cds, nbis_proxy = cds["CRWV"], cds["ORCL"], cds["NBIS"]
+    crwv_idp, orcl_idp = idp["CRWV"], idp["ORCL"]
 
     # Dual-axis chart
     fig_cds = make_subplots(specs=[[{"secondary_y": True}]])
@@ -342,32 +236,127 @@ with tab5:
     fig_cds.update_yaxes(title_text="CDS Spread (bps)", secondary_y=False, range=[0, 800])
     fig_cds.update_yaxes(title_text="5-Yr Cumulative IDP (%)", secondary_y=True, range=[0, 50])
 
-    st.plotly_chart(fig_cds, use_container_width=True)
+    plotly_chart(fig_cds, use_container_width=True)
+
+    # Equity / Realized-Vol Overlay (batched, incrementally cached market data)
+    if st.checkbox("Show equity & realized-vol overlay", value=True, key="tab_cds_equity"):
+        market = datasources.get("market_overlay", start=CHART_START)
+        tickers = [c[:-len("_close")] for c in market.columns if c.endswith("_close")]
+        if tickers:
+            # Streamlit can't see plotly zoom events — narrowing this range re-queries the store
+            # for just that window, which the chart layer then downsamples at full detail
+            first, last = market["date"].min().date(), market["date"].max().date()
+            # When new bars move the data bounds, an end left at the old bound follows it;
+            # only an end the user narrowed explicitly stays put
+            bounds, window = st.session_state.get("tab_cds_equity_bounds"), st.session_state.get("tab_cds_equity_range")
+            if window is not None and bounds is not None and bounds != (first, last):
+                lo = first if window[0] == bounds[0] else min(max(window[0], first), last)
+                hi = last if window[1] == bounds[1] else min(max(window[1], lo), last)
+                st.session_state["tab_cds_equity_range"] = (lo, hi)
+            st.session_state["tab_cds_equity_bounds"] = (first, last)
+            window = st.slider("Overlay date range", first, last, (first, last), key="tab_cds_equity_range")
+            if tuple(window) != (first, last):
+                market = datasources.get("market_overlay", start=window[0], end=window[1])
+            fig_eq = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                                   subplot_titles=("Close (rebased, first bar = 100)", f"{market_data.VOL_WINDOW}-Day Realized Vol (annualized %)"))
+            for ticker in tickers:
+                fig_eq.add_trace(go.Scatter(name=f"{ticker} close", x=market["date"], y=market[f"{ticker}_rebased"], mode="lines", legendgroup=ticker), row=1, col=1)
+                fig_eq.add_trace(go.Scatter(name=f"{ticker} vol", x=market["date"], y=market[f"{ticker}_vol"], mode="lines", line=dict(dash="dot"), legendgroup=ticker, showlegend=False), row=2, col=1)
+            fig_eq.update_layout(title="Canary Equities — Price & Realized Volatility", height=520, legend=dict(x=0.02, y=0.98, font=dict(size=10)))
+            plotly_chart(fig_eq, use_container_width=True, key="cds_equity_overlay")
+        else:
+            st.info("No market data yet — it is being fetched in the background (or run `python cli.py refresh market_overlay`).")
 
     # Latest Values Table
     latest = pd.DataFrame({
         "Company": ["CoreWeave (CRWV)", "Oracle (ORCL)", "Nebius (NBIS Proxy)"],
-        "Latest CDS (bps)": [675, 110, "~450"],
-        "5-Yr Default Probability": [f"{crwv_idp[-1]}%", f"{orcl_idp[-1]}%", "N/A"]
+        "Latest CDS (bps)": [f"{crwv_cds.iloc[-1]:.0f}", f"{orcl_cds.iloc[-1]:.0f}", f"~{nbis_proxy.iloc[-1]:.0f}"],
+        "5-Yr Default Probability": [f"{crwv_idp.iloc[-1]}%", f"{orcl_idp.iloc[-1]}%", "N/A"]
     })
     st.dataframe(latest, use_container_width=True)
 
-    st.warning("CRWV at **42%** 5-year default probability — officially distressed (>40% threshold)")
-    st.caption("Data: Bloomberg/Refinitiv • Nov 24, 2025 • Recovery rate = 35%")
+    if crwv_idp.iloc[-1] > 40:
+        st.warning(f"CRWV at **{crwv_idp.iloc[-1]:.0f}%** 5-year default probability — officially distressed (>40% threshold)")
+    st.caption(f"Data: Bloomberg/Refinitiv • Nov 24, 2025 • Recovery rate = {recovery:.0%}")
+
+    # Monte Carlo default risk — spreads evolve as GBM, defaults drawn from the path-wise hazard
+    with st.expander("Monte Carlo: default risk under spread volatility"):
+        c1, c2, c3 = st.columns(3)
+        spread_vol = c1.slider("Spread volatility (%/yr)", 10, 150, 60, 10, key="tab_mc_spread_vol")
+        spread_drift = c2.slider("Spread drift (log %/yr)", -50, 50, 0, 5, key="tab_mc_spread_drift")
+        distress = c3.slider("Distress threshold (bps)", 300, 2000, 1000, 100, key="tab_mc_distress")
+        rows = []
+        with instrumentation.span("mc_simulate", model="credit"):
+            for issuer in cds.columns:
+                params = scenarios.CreditParams(float(cds[issuer].iloc[-1]), spread_drift / 100, spread_vol / 100, recovery,
+                                                5.0, 25_000, 0, float(distress))
+                r = scenarios.credit_risk(params)
+                rows.append({
+                    "Issuer": issuer,
+                    "5-Yr PD (mean)": f"{r['pd_mean']:.1%}",
+                    "5-Yr PD (5–95%)": f"{r['pd_p5']:.0%} – {r['pd_p95']:.0%}",
+                    "Expected years to default": round(r["expected_years_to_default"], 2),
+                    f"P(spread > {distress} bps)": f"{r['p_distress']:.1%}",
+                    "Expected years to distress": round(r["expected_years_to_distress"], 2),
+                })
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        st.caption("25,000 paths per issuer, monthly steps, continuous compounding — with zero volatility the mean PD "
+                   "matches the deterministic 1 − exp(−hT) rather than the table's annual convention.")
 
-# Sidebar Alerts & Export
-st.sidebar.header("Alerts")
-margin = data["historical_data"]["Inference_Revenue_B"].iloc[-1] / data["historical_data"]["Inference_Cost_B"].iloc[-1]
-if margin < 1.0:
-    st.sidebar.error(f"Q3 2025 Margin {margin:.2f}x — Burning cash")
+# ==============================
+# TAB NAVIGATION
+# Lazy mode renders only the selected section, so a rerun builds and ships one
+# tab's figures instead of all of them. Widgets inside tabs should use keys
+# prefixed "tab_" so their state survives while their tab isn't rendered.
+# ==============================
+TABS = {
+    "Profit & CapEx": render_profit_capex,
+    "Inference vs Training": render_inference_training,
+    "Job Loss Risk": render_job_loss,
+    "Live Pricing": render_live_pricing,
+    "CDS Canaries": render_cds_canaries,
+}
+
+# Streamlit drops state for widgets not drawn this run — re-assigning keeps it
+for key in list(st.session_state):
+    if key.startswith("tab_"):
+        st.session_state[key] = st.session_state[key]
+
+lazy_tabs = st.sidebar.checkbox("Lazy tab rendering (only build the active tab)", value=True, key="lazy_tabs")
+if lazy_tabs:
+    active_tab = st.radio("Section", list(TABS), horizontal=True, key="tab_active", label_visibility="collapsed")
+    with instrumentation.span("tab_render", tab=active_tab):
+        TABS[active_tab]()
 else:
-    st.sidebar.success(f"Q3 2025 Margin {margin:.2f}x — Profitable")
-st.sidebar.success(f"Utilization 72% Q3 2025 — Healthy")
-st.sidebar.success(f"Tokens 9.4x YoY Q3 2025 — Exploding")
-
-if st.sidebar.button("Export CSV"):
-    export_df = pd.concat([data["historical_data"], data["deflation_data"], data["pricing"]])
-    csv = export_df.to_csv(index=False)
-    st.sidebar.download_button("Download", csv, "ai_metrics_q3_2025.csv", "text/csv")
+    # Define 5 tabs in single row (shorter titles for no wrap)
+    for tab, (name, render) in zip(st.tabs(list(TABS)), TABS.items()):
+        with tab, instrumentation.span("tab_render", tab=name):
+            render()
 
+# Sidebar Alerts & Export
+st.sidebar.header("Alerts")
+for level, message in alerts.compute_alerts(data):
+    getattr(st.sidebar, level)(message)
+
+# Export — built once per data version and format, then served from disk. A callable
+# `data` runs only on click, so reruns neither build the zip nor read it into memory.
+export_format = st.sidebar.selectbox("Export format", list(exports.FORMATS), format_func=lambda f: {"csv": "CSV (zip)", "parquet": "Parquet (zip)", "arrow": "Arrow IPC (zip)"}[f])
+
+def export_data(fmt=export_format):
+    # Hand Streamlit the open file rather than a bytes copy; it buffers the response
+    # itself (media file manager), and the handle closes once that read is done
+    with instrumentation.span("export_download", format=fmt):
+        return open(exports.export_path(fmt), "rb")
+
+st.sidebar.download_button("Download export", export_data, f"ai_metrics_{export_format}.zip", exports.FORMATS[export_format][2], on_click="ignore")
+
+# Performance debug panel — process-wide spans/counters since start (all sessions)
+if st.sidebar.checkbox("Show performance debug panel", value=False, key="debug_panel"):
+    with st.sidebar.expander("Performance", expanded=True):
+        st.dataframe(pd.DataFrame(instrumentation.span_summary()), hide_index=True)
+        st.dataframe(pd.DataFrame(instrumentation.counter_summary()), hide_index=True)
+        st.download_button("Prometheus text", instrumentation.prometheus_text(), "metrics.txt", "text/plain", on_click="ignore")
+        if st.button("Reset metrics"):
+            instrumentation.reset()
 st.sidebar.caption("v3.1 • Full historical auto-pull • Gemini 3 added • Nov 23, 2025")
+instrumentation.observe("script_run", time.perf_counter() - _run_start)
@@ -0,0 +1,37 @@
+# ==============================
+# Sidebar Alerts — computed from loaded data, no Streamlit needed
+# Each alert is (level, message) with level in {"success", "warning", "error"},
+# matching the st.sidebar method the dashboard renders it with.
+# ==============================
+
+import metrics
+
+UTILIZATION_HEALTHY_PCT = 60
+TOKEN_GROWTH_EXPLODING_X = 8
+
+
+def compute_alerts(data):
+    """Alerts for the latest quarter of `data` (as returned by auto_pull_historical_data)."""
+    hist = data["historical_data"]
+    year, q = hist["Quarter"].iloc[-1].split("-")
+    quarter = f"{q} {year}"  # "2025-Q3" -> "Q3 2025"
+    alerts = []
+
+    margin = metrics.margin_ratio(hist["Inference_Revenue_B"], hist["Inference_Cost_B"]).iloc[-1]
+    if margin < 1.0:
+        alerts.append(("error", f"{quarter} Margin {margin:.2f}x — Burning cash"))
+    else:
+        alerts.append(("success", f"{quarter} Margin {margin:.2f}x — Profitable"))
+
+    utilization = hist["Utilization_pct"].iloc[-1]
+    if utilization >= UTILIZATION_HEALTHY_PCT:
+        alerts.append(("success", f"Utilization {utilization:.0f}% {quarter} — Healthy"))
+    else:
+        alerts.append(("warning", f"Utilization {utilization:.0f}% {quarter} — Underused"))
+
+    tokens = hist["Token_Volume_YoY"].iloc[-1]
+    if tokens >= TOKEN_GROWTH_EXPLODING_X:
+        alerts.append(("success", f"Tokens {tokens:.1f}x YoY {quarter} — Exploding"))
+    else:
+        alerts.append(("warning", f"Tokens {tokens:.1f}x YoY {quarter} — Decelerating"))
+    return alerts
@@ -0,0 +1,271 @@
+# ==============================
+# Benchmark Suite — cold start, per-tab rerun latency, payload size, scrape throughput,
+# long-series chart payload
+# Runs fully offline: the pricing URLs point at a local stand-in (bench/standin.py),
+# market data comes from fixtures/market, and cache/store directories are throwaway
+# temp dirs. The app is driven through Streamlit's AppTest harness. Results go to
+# bench/results/<sha>-<time>.json and are compared against the previous result
+# recorded with the same parameters.
+#
+#   python bench/run_bench.py                      # defaults
+#   python bench/run_bench.py --latency 0.3 --slow 8 --fail-on-regression
+# ==============================
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "ai_dashboard.py")
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _use_dirs(base):
+    os.environ["AI_DASHBOARD_CACHE_DIR"] = os.path.join(base, "cache")
+    os.environ["AI_DASHBOARD_STORE_DIR"] = os.path.join(base, "store")
+    os.environ["AI_DASHBOARD_MARKET_PROVIDER"] = "fixture"  # Equity bars from fixtures/market, never Yahoo
+
+
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(APP, default_timeout=120)
+
+
+def _plotly_bytes(at):
+    return sum(len(el.proto.spec) for el in at.get("plotly_chart"))
+
+
+def _timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception[0].value}")
+    return elapsed
+
+
+# ——— Child process: one first render, for cold / warm-restart start ———
+def child_first_run():
+    at = _app_test()
+    elapsed = _timed_run(at)
+    print(json.dumps({"first_run_s": elapsed, "plotly_bytes": _plotly_bytes(at)}))
+
+
+def _first_run_in_subprocess(base):
+    env = dict(os.environ, AI_DASHBOARD_CACHE_DIR=os.path.join(base, "cache"), AI_DASHBOARD_STORE_DIR=os.path.join(base, "store"),
+               AI_DASHBOARD_MARKET_PROVIDER="fixture")
+    out = subprocess.run([sys.executable, __file__, "--child"], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ——— Measurements ———
+def bench_start(repeats):
+    """Cold start (empty cache + store) and warm restart (same dirs, new process)."""
+    cold, warm = [], []
+    for _ in range(repeats):
+        base = tempfile.mkdtemp(prefix="aidash-bench-")
+        try:
+            cold.append(_first_run_in_subprocess(base)["first_run_s"])
+            warm.append(_first_run_in_subprocess(base)["first_run_s"])
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+    return {"cold_start_s": statistics.median(cold), "warm_restart_s": statistics.median(warm)}
+
+
+def bench_tabs(reruns):
+    """Per-tab switch time, log-scale toggle rerun time and plotly payload, lazy vs eager."""
+    import market_data
+    # Seed the equity bars first so the CDS tab always measures its overlay chart,
+    # rather than racing the background fetch
+    market_data.refresh(provider=market_data.FixtureProvider())
+    results = {}
+    at = _app_test()
+    _timed_run(at)
+    tabs = at.radio(key="tab_active").options
+    for tab in tabs:
+        name = tab.lower().replace(" & ", "_").replace(" ", "_")
+        at.radio(key="tab_active").set_value(tab)
+        results[f"tab_switch_s.{name}"] = _timed_run(at)
+        results[f"plotly_bytes.{name}"] = _plotly_bytes(at)
+        toggles = []
+        for i in range(reruns):
+            at.checkbox(key="log_scale").set_value(i % 2 == 1)
+            toggles.append(_timed_run(at))
+        results[f"log_toggle_rerun_s.{name}"] = statistics.median(toggles)
+
+    at.checkbox(key="lazy_tabs").set_value(False)
+    _timed_run(at)
+    results["plotly_bytes.all_tabs_eager"] = _plotly_bytes(at)
+    toggles = []
+    for i in range(reruns):
+        at.checkbox(key="log_scale").set_value(i % 2 == 1)
+        toggles.append(_timed_run(at))
+    results["log_toggle_rerun_s.all_tabs_eager"] = statistics.median(toggles)
+    return results
+
+
+def bench_scrape(repeats, page_count):
+    """Pricing fetch stage and full cache refill against the stand-in."""
+    import datasources
+    import pricing
+
+    cold = []
+    for _ in range(repeats):
+        pricing.reset_state()
+        start = time.perf_counter()
+        pricing.fetch_pricing()
+        cold.append(time.perf_counter() - start)
+    fetches = []  # Conditional refetches (304s once validators are known)
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pricing.fetch_pricing()
+        fetches.append(time.perf_counter() - start)
+    refills = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        datasources.refresh()
+        refills.append(time.perf_counter() - start)
+    fetch_s = statistics.median(fetches)
+    return {
+        "pricing_cold_fetch_s": statistics.median(cold),
+        "pricing_fetch_s": fetch_s,
+        "pricing_pages_per_s": page_count / fetch_s if fetch_s else float("inf"),
+        "cache_refill_s": statistics.median(refills),
+    }
+
+
+def bench_long_series(sizes=(10_000, 100_000, 1_000_000)):
+    """Payload and prepare time of a daily-style line chart as history grows (should stay flat)."""
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+    import figures
+
+    results = {}
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        fig = go.Figure(go.Scatter(x=pd.date_range("2000-01-01", periods=n, freq="h"),
+                                   y=np.cumsum(rng.standard_normal(n)), mode="lines"))
+        start = time.perf_counter()
+        payload = figures.thin(fig).to_json()
+        results[f"long_series_prepare_s.{n}"] = time.perf_counter() - start
+        results[f"long_series_bytes.{n}"] = len(payload)
+    return results
+
+
+# ——— Results ———
+def _git_sha():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _previous(params, exclude):
+    """Most recent stored result recorded with the same parameters."""
+    candidates = []
+    for path in glob.glob(os.path.join(RESULTS_DIR, "*.json")):
+        if os.path.abspath(path) == os.path.abspath(exclude):
+            continue
+        with open(path, encoding="utf-8") as f:
+            result = json.load(f)
+        if result.get("params") == params:
+            candidates.append(result)
+    return max(candidates, key=lambda r: r["timestamp"]) if candidates else None
+
+
+def _higher_is_better(metric):
+    return metric.split(".")[0].endswith("_per_s")
+
+
+def compare(current, previous, threshold):
+    """Print metric deltas; returns the names of metrics that regressed by more than `threshold`."""
+    regressions = []
+    print(f"\n{'metric':<45}{'current':>12}{'previous':>12}{'delta':>9}")
+    for metric, value in current["metrics"].items():
+        old = (previous or {}).get("metrics", {}).get(metric)
+        if old in (None, 0):
+            print(f"{metric:<45}{value:>12.4g}{'—':>12}{'':>9}")
+            continue
+        delta = (value - old) / old
+        worse = -delta if _higher_is_better(metric) else delta
+        flag = "  REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(metric)
+        print(f"{metric:<45}{value:>12.4g}{old:>12.4g}{delta:>+9.0%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI dashboard benchmark suite (offline)")
+    parser.add_argument("--latency", type=float, default=0.2, help="stand-in latency per pricing page (s)")
+    parser.add_argument("--slow", type=float, default=0.0, help="extra latency for one provider, to exercise the fetch deadline (s)")
+    parser.add_argument("--reruns", type=int, default=5, help="log-scale toggles per tab")
+    parser.add_argument("--repeats", type=int, default=3, help="cold-start and scrape repetitions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown flagged as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true", help="don't write a result file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child_first_run()
+        return 0
+
+    base = tempfile.mkdtemp(prefix="aidash-bench-")
+    _use_dirs(base)
+    import pricing
+    from standin import StandIn, slug
+
+    models = list(pricing.PRICING_URLS)
+    overrides = {slug(models[-1]): args.latency + args.slow} if args.slow else {}
+    params = {"latency": args.latency, "slow": args.slow, "reruns": args.reruns, "repeats": args.repeats}
+    try:
+        with StandIn(models, latency=args.latency, overrides=overrides) as standin:
+            os.environ["AI_DASHBOARD_PRICING_URLS"] = json.dumps(standin.urls)
+            pricing.PRICING_URLS = standin.urls
+            metrics = {}
+            metrics.update(bench_start(args.repeats))
+            metrics.update(bench_tabs(args.reruns))
+            metrics.update(bench_scrape(args.repeats, len(models)))
+            metrics.update(bench_long_series())
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    import streamlit
+    result = {
+        "version": _git_sha(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "params": params,
+        "metrics": metrics,
+    }
+    path = os.path.join(RESULTS_DIR, f"{result['version']}-{datetime.now():%Y%m%dT%H%M%S}.json")
+    regressions = compare(result, _previous(params, path), args.threshold)
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nsaved {os.path.relpath(path, ROOT)}")
+    if regressions and args.fail_on_regression:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
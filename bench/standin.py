@@ -0,0 +1,100 @@
+# ==============================
+# Local HTTP stand-in for the provider pricing pages
+# Serves one pricing page per provider on 127.0.0.1 with configurable per-path
+# latency, so scrape benchmarks run offline and reproducibly. Pages come from
+# fixtures/pricing when a fixture exists; responses carry ETag/Last-Modified and
+# answer conditional requests with 304, like the real providers' CDNs.
+# ==============================
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "pricing")
+
+PAGE = """<!doctype html><html><head><title>{model} pricing</title></head><body>
+<h1>{model}</h1>
+<table class="pricing"><tr><th>Model</th><th>Input</th><th>Output</th></tr>
+<tr><td>{model}</td><td>$1.00 / 1M tokens</td><td>$4.00 / 1M tokens</td></tr></table>
+</body></html>"""
+
+
+def slug(model):
+    return re.sub(r"[^a-z0-9]+", "-", model.lower()).strip("-")
+
+
+def fixture_pages():
+    """{model: html} for every page listed in fixtures/pricing/expected.json."""
+    try:
+        with open(os.path.join(FIXTURE_DIR, "expected.json"), encoding="utf-8") as f:
+            expected = json.load(f)
+    except OSError:
+        return {}
+    pages = {}
+    for model, spec in expected.items():
+        with open(os.path.join(FIXTURE_DIR, spec["file"]), encoding="utf-8") as f:
+            pages[model] = f.read()
+    return pages
+
+
+class StandIn:
+    """Threaded HTTP server; `latency` is seconds per request, `overrides` maps slug -> seconds."""
+
+    def __init__(self, models, latency=0.0, overrides=None, pages=None):
+        self.latency = latency
+        self.overrides = dict(overrides or {})
+        pages = fixture_pages() if pages is None else pages
+        self.pages = {slug(m): pages.get(m, PAGE.format(model=m)).encode("utf-8") for m in models}
+        self.etags = {key: '"' + hashlib.sha1(body).hexdigest()[:16] + '"' for key, body in self.pages.items()}
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.requests = 0
+        self.not_modified = 0
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                key = self.path.strip("/")
+                standin.requests += 1
+                time.sleep(standin.overrides.get(key, standin.latency))
+                data = standin.pages.get(key)
+                if data is None:
+                    self.send_error(404)
+                    return
+                etag = standin.etags[key]
+                if self.headers.get("If-None-Match") == etag or (
+                        "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == standin.last_modified):
+                    standin.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", standin.last_modified)
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):  # Client gave up (deadline)
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.urls = {m: f"http://127.0.0.1:{self.server.server_port}/{slug(m)}" for m in models}
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, name="pricing-standin", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,127 @@
+# ==============================
+# Headless CLI — refresh caches, compute alerts and write snapshots from cron
+# without starting a Streamlit server.
+#
+#   python cli.py refresh                 # reload every data source
+#   python cli.py alerts [--json]         # sidebar alerts for the latest quarter
+#   python cli.py snapshot --out snaps/   # sources + alerts to a timestamped dir
+#   python cli.py export --format parquet # cached per-dataset export zip
+#   python cli.py check-pricing           # extraction rules vs fixtures/pricing
+#   python cli.py store list              # time-series store commands
+# ==============================
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+
+def cmd_refresh(args):
+    import datasources
+    names = args.source or list(datasources.sources())
+    unknown = [n for n in names if n not in datasources.sources()]
+    if unknown:
+        # Validated here, not via argparse choices, so the parser doesn't import datasources
+        print(f"unknown source(s): {', '.join(unknown)} (expected: {', '.join(datasources.sources())})", file=sys.stderr)
+        return 2
+    for name in names:
+        datasources.refresh(name)
+        print(f"{name}: {datasources.get_entry(name).version}")
+
+
+def cmd_alerts(args):
+    import alerts
+    import datasources
+    result = alerts.compute_alerts(datasources.auto_pull_historical_data())
+    if args.json:
+        print(json.dumps([{"level": level, "message": message} for level, message in result], ensure_ascii=False, indent=2))
+    else:
+        for level, message in result:
+            print(f"[{level}] {message}")
+    return 1 if any(level == "error" for level, _ in result) and args.fail_on_error else 0
+
+
+def cmd_snapshot(args):
+    import alerts
+    import datasources
+    import pandas as pd
+
+    if args.refresh:
+        datasources.refresh()
+    out = os.path.join(args.out, datetime.now().strftime("%Y%m%dT%H%M%S"))
+    os.makedirs(out, exist_ok=True)
+    for name in datasources.sources():
+        value = datasources.get(name)
+        if isinstance(value, pd.DataFrame):
+            value.to_csv(os.path.join(out, f"{name}.csv"), index=False)
+    result = alerts.compute_alerts(datasources.auto_pull_historical_data())
+    with open(os.path.join(out, "alerts.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "data_version": datasources.data_version(),
+            "alerts": [{"level": level, "message": message} for level, message in result],
+        }, f, ensure_ascii=False, indent=2)
+    print(out)
+
+
+def cmd_export(args):
+    import shutil
+    import exports
+    path = exports.export_path(args.format)
+    if args.out:
+        shutil.copyfile(path, args.out)
+        path = args.out
+    print(path)
+
+
+def cmd_check_pricing(args):
+    import pricing
+    failed = 0
+    for model, name, want, got, ok in pricing.check_fixtures(args.fixtures):
+        failed += not ok
+        print(f"[{'ok' if ok else 'FAIL'}] {model} ({name}): expected {want}, got {got}")
+    return 1 if failed else 0
+
+
+def cmd_store(args):
+    import store
+    store.main(args.store_args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI Profit Dashboard — headless compute/export")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_refresh = sub.add_parser("refresh", help="reload data sources into the on-disk cache")
+    p_refresh.add_argument("source", nargs="*", help="source names (default: all)")
+    p_refresh.set_defaults(func=cmd_refresh)
+
+    p_alerts = sub.add_parser("alerts", help="print the sidebar alerts")
+    p_alerts.add_argument("--json", action="store_true")
+    p_alerts.add_argument("--fail-on-error", action="store_true", help="exit 1 if any alert is an error")
+    p_alerts.set_defaults(func=cmd_alerts)
+
+    p_snapshot = sub.add_parser("snapshot", help="write every source and the alerts to a timestamped directory")
+    p_snapshot.add_argument("--out", default="snapshots")
+    p_snapshot.add_argument("--refresh", action="store_true", help="reload sources first")
+    p_snapshot.set_defaults(func=cmd_snapshot)
+
+    p_export = sub.add_parser("export", help="build (or reuse) the export zip for the current data version")
+    p_export.add_argument("--format", default="csv", choices=["csv", "parquet", "arrow"])
+    p_export.add_argument("--out", help="copy the zip here (default: print its cache path)")
+    p_export.set_defaults(func=cmd_export)
+
+    p_check = sub.add_parser("check-pricing", help="run pricing extraction rules against saved HTML fixtures")
+    p_check.add_argument("--fixtures", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pricing"))
+    p_check.set_defaults(func=cmd_check_pricing)
+
+    p_store = sub.add_parser("store", help="time-series store commands (see store.py)", add_help=False)
+    p_store.add_argument("store_args", nargs=argparse.REMAINDER)
+    p_store.set_defaults(func=cmd_store)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
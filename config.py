@@ -0,0 +1,22 @@
+# ==============================
+# Shared settings — paths read from the environment, importable by any module
+# without pulling in the data layer.
+#
+#   AI_DASHBOARD_CACHE_DIR=/var/cache/aidash   # source cache, pricing state, exports
+#   AI_DASHBOARD_LOOKBACK_YEARS=5               # history the dashboard's charts read
+# ==============================
+
+import os
+from datetime import date
+
+CACHE_DIR = os.environ.get("AI_DASHBOARD_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+# Charts query the store from here on, so startup and memory don't grow with history;
+# exports and the CLI still read everything
+LOOKBACK_YEARS = int(os.environ.get("AI_DASHBOARD_LOOKBACK_YEARS", "5"))
+
+
+def lookback_start(today=None):
+    """First day of the default chart window: Jan 1, LOOKBACK_YEARS years back (stable within a year)."""
+    today = today or date.today()
+    return date(today.year - LOOKBACK_YEARS, 1, 1)
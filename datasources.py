@@ -0,0 +1,322 @@
+# ==============================
+# Data-Source Layer — one cache entry per source
+# Each source has its own TTL. Stale entries are served immediately while a
+# background thread refreshes them (stale-while-revalidate). Entries persist
+# to a local SQLite file so restarts and new replicas start warm. Sources backed
+# by the time-series store also reload as soon as the store's series change.
+# Windowed sources (the store-backed ones) take a date window instead: each view
+# queries the store for just its range, only the most recently used windows stay
+# in memory, and nothing is copied into SQLite — the store is already on disk.
+# ==============================
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+import pandas as pd
+
+import instrumentation
+import store
+from config import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+CACHE_DB = os.path.join(CACHE_DIR, "sources.sqlite")
+
+Entry = namedtuple("Entry", ["value", "fetched_at", "version", "token"])
+
+WINDOW_ENTRIES = 32  # Windowed query results kept in memory, across all sources
+
+_sources = {}       # name -> (loader, ttl seconds, watch callable or None, windowed)
+_memory = {}        # name -> Entry
+_windows = OrderedDict()  # (name, start, end) -> Entry, least recently used first
+_fetchers = {}      # name -> fetch callable run by refresh()
+_locks = {}         # name -> Lock guarding load/refresh
+_refreshing = set()  # names with a background refresh in flight
+_state_lock = threading.Lock()
+
+
+# ——— SQLite persistence ———
+def _connect():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(CACHE_DB, timeout=10)
+    conn.execute("CREATE TABLE IF NOT EXISTS source_cache (name TEXT PRIMARY KEY, fetched_at REAL, version TEXT, payload BLOB, token TEXT)")
+    return conn
+
+
+def _read_disk(name):
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute("SELECT payload, fetched_at, version, token FROM source_cache WHERE name = ?", (name,)).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        log.warning("cache read failed for %s: %s", name, e)
+        return None
+    if row is None:
+        return None
+    try:
+        return Entry(pickle.loads(row[0]), row[1], row[2], row[3])
+    except Exception as e:  # Unpicklable after a code change — treat as a miss
+        log.warning("discarding unreadable cache entry %s: %s", name, e)
+        return None
+
+
+def _write_disk(name, payload, entry):
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO source_cache (name, fetched_at, version, payload, token) VALUES (?, ?, ?, ?, ?)",
+                             (name, entry.fetched_at, entry.version, payload, entry.token))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        log.warning("cache write failed for %s: %s", name, e)
+
+
+# ——— Cache core ———
+def register(name, ttl, watch=None, windowed=False, fetch=None):
+    """Decorator registering `loader()` as the source `name` with its own TTL (seconds).
+
+    `watch()` returns a cheap change token; when it differs from the cached
+    entry's token the source reloads synchronously regardless of TTL.
+    Windowed loaders take `loader(start=None, end=None)` and are never persisted.
+    `fetch()` is the network step refresh() runs synchronously for a source whose
+    loader otherwise leaves it to the background.
+    """
+    def decorator(loader):
+        _sources[name] = (loader, ttl, watch, windowed)
+        if fetch is not None:
+            _fetchers[name] = fetch
+        _locks[name] = threading.Lock()
+        return loader
+    return decorator
+
+
+def _lock_for(name):
+    if name not in _sources:
+        raise KeyError(f"Unknown data source: {name}")
+    return _locks[name]
+
+
+def _load(name):
+    """Run the loader for `name` and store the result in memory and on disk."""
+    loader, _, watch, _ = _sources[name]
+    token = watch() if watch else None
+    with instrumentation.span("data_load", source=name):
+        value = loader()
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    entry = Entry(value, time.time(), hashlib.sha1(payload).hexdigest()[:12], token)
+    _memory[name] = entry
+    _write_disk(name, payload, entry)
+    return entry
+
+
+def _background_refresh(name):
+    try:
+        with _lock_for(name):
+            _load(name)
+    except Exception as e:  # Keep serving the stale value
+        log.warning("background refresh of %s failed: %s", name, e)
+    finally:
+        with _state_lock:
+            _refreshing.discard(name)
+
+
+def _schedule_refresh(name):
+    with _state_lock:
+        if name in _refreshing:
+            return
+        _refreshing.add(name)
+    threading.Thread(target=_background_refresh, args=(name,), name=f"refresh-{name}", daemon=True).start()
+
+
+def _window_entry(name, start, end):
+    """Entry for one date window of a windowed source, queried on demand."""
+    loader, ttl, watch, _ = _sources[name]
+    key = (name, None if start is None else str(pd.Timestamp(start)), None if end is None else str(pd.Timestamp(end)))
+    token = watch() if watch else ""
+    with _state_lock:
+        entry = _windows.get(key)
+        if entry is not None:
+            _windows.move_to_end(key)
+    if entry is not None and entry.token == token and time.time() - entry.fetched_at <= ttl:
+        instrumentation.count("cache_requests", cache="window", source=name, result="hit")
+        return entry
+    with _lock_for(name):
+        with instrumentation.span("data_load", source=name):
+            value = loader(start=start, end=end)
+    # The store's change token identifies the data, so no need to hash the payload
+    entry = Entry(value, time.time(), hashlib.sha1("|".join(map(str, key + (token,))).encode()).hexdigest()[:12], token)
+    with _state_lock:
+        _windows[key] = entry
+        while len(_windows) > WINDOW_ENTRIES:
+            _windows.popitem(last=False)
+    instrumentation.count("cache_requests", cache="window", source=name, result="miss")
+    return entry
+
+
+def get_entry(name, start=None, end=None):
+    """Entry for `name`; loads synchronously only when nothing is cached anywhere.
+
+    Windowed sources return rows with start <= date <= end (either bound optional).
+    """
+    lock = _lock_for(name)
+    _, ttl, watch, windowed = _sources[name]
+    if windowed:
+        return _window_entry(name, start, end)
+    if start is not None or end is not None:
+        raise ValueError(f"{name} is not a windowed source")
+    entry = _memory.get(name)
+    result = "hit"
+    if entry is None:
+        with lock:
+            entry = _memory.get(name)
+            if entry is None:
+                entry = _read_disk(name)
+                result = "disk"
+            if entry is None:
+                instrumentation.count("cache_requests", cache="source", source=name, result="miss")
+                return _load(name)
+            _memory[name] = entry
+    if watch is not None and entry.token != watch():
+        with lock:
+            entry = _memory[name]
+            if entry.token != watch():
+                result = "changed"
+                entry = _load(name)
+    elif time.time() - entry.fetched_at > ttl:
+        result = "stale"
+        _schedule_refresh(name)
+    instrumentation.count("cache_requests", cache="source", source=name, result=result)
+    return entry
+
+
+def get(name, start=None, end=None):
+    return get_entry(name, start, end).value
+
+
+def refresh(name=None):
+    """Synchronously reload one source, or every source when `name` is None."""
+    names = list(_sources) if name is None else [name]
+    for n in names:
+        if n in _fetchers:
+            _fetchers[n]()
+        if _sources[n][3]:
+            with _state_lock:
+                for key in [k for k in _windows if k[0] == n]:
+                    del _windows[key]
+            get_entry(n)
+        else:
+            with _lock_for(n):
+                _load(n)
+
+
+def sources():
+    """Registered source names, in registration order."""
+    return list(_sources)
+
+
+def data_version(names=None):
+    """Short hash over the versions of `names` (default: all sources)."""
+    names = sorted(_sources) if names is None else names
+    joined = "|".join(f"{n}={get_entry(n).version}" for n in names)
+    return hashlib.sha1(joined.encode()).hexdigest()[:12]
+
+
+# ==============================
+# SOURCES
+# ==============================
+def _series(series, start=None, end=None):
+    """Query the time-series store, seeding it from data/seed on first use."""
+    if store.version(series) is None:
+        store.seed()
+    return store.query(series, start=start, end=end)
+
+
+def _watch(series):
+    return lambda: store.version(series) or ""
+
+
+@register("historical_data", ttl=7 * 86400, watch=_watch("historical_quarterly"), windowed=True)
+def load_historical_data(start=None, end=None):
+    # Historical Quarterly Data (Synthesized from Bain, Epoch, SEC, etc.)
+    return _series("historical_quarterly", start, end).rename(columns={"label": "Quarter"})
+
+
+@register("h100_rental", ttl=86400, watch=_watch("h100_rental"), windowed=True)
+def load_h100_rental(start=None, end=None):
+    # H100 Rental $/GPU-hr (monthly avg)
+    return _series("h100_rental", start, end).rename(columns={"label": "Month", "price": "Price"})
+
+
+@register("job_loss", ttl=86400, watch=_watch("job_loss"), windowed=True)
+def load_job_loss(start=None, end=None):
+    # Job Loss Historical: weekly X posts, sentiment, U.S. Gini
+    return _series("job_loss", start, end).rename(columns={"label": "Quarter"})
+
+
+@register("deflation_data", ttl=7 * 86400, watch=_watch("deflation"), windowed=True)
+def load_deflation_data(start=None, end=None):
+    # Price Deflation Historical
+    return _series("deflation", start, end).rename(columns={"label": "Quarter"})
+
+
+@register("asic_share", ttl=7 * 86400, watch=_watch("asic_share"), windowed=True)
+def load_asic_share(start=None, end=None):
+    # % of inference on ASICs vs GPUs (MarketsandMarkets/Aranca/CNBC est.)
+    return _series("asic_share", start, end).rename(columns={"label": "Quarter"})
+
+
+@register("cds_spreads", ttl=86400, watch=_watch("cds_spreads"), windowed=True)
+def load_cds_spreads(start=None, end=None):
+    # CDS spreads in bps, one column per issuer (Bloomberg/Refinitiv)
+    return _series("cds_spreads", start, end).rename(columns={"label": "Quarter"})
+
+
+def _market_token():
+    import market_data
+    return market_data.token()
+
+
+def _market_fetch():
+    import market_data
+    market_data.refresh()
+
+
+@register("market_overlay", ttl=6 * 3600, watch=_market_token, windowed=True, fetch=_market_fetch)
+def load_market_overlay(start=None, end=None):
+    # Equity closes + realized vol for the CDS watchlist; never blocks on the network —
+    # bars fetched in the background change the store token and trigger a reload
+    import market_data
+    return market_data.load_overlay(start, end)
+
+
+@register("pricing", ttl=6 * 3600)
+def load_pricing():
+    # Pricing Scrape (Current Flagships) — concurrent, bounded by pricing.FETCH_DEADLINE
+    from pricing import fetch_pricing
+    pricing = fetch_pricing()
+
+    # Auto-Add Gemini 3 (Nov 18, 2025 release)
+    if datetime.now() > datetime(2025, 11, 18):
+        pricing = pd.concat([pricing, pd.DataFrame([{"Model": "Gemini 3", "Input $/M": 0.35, "Output $/M": 1.05}])], ignore_index=True)
+    return pricing
+
+
+def auto_pull_historical_data(start=None):
+    """Everything the dashboard's tabs and sidebar alerts read, in one dict (series from `start`)."""
+    job_loss = get("job_loss", start)
+    return {
+        "historical_data": get("historical_data", start),
+        "job_posts": job_loss["job_posts"].tolist(), "sentiment_scores": job_loss["sentiment_scores"].tolist(),
+        "deflation_data": get("deflation_data", start), "pricing": get("pricing")
+    }
@@ -0,0 +1,76 @@
+# ==============================
+# Export Pipeline — one zip per (data version, format), built once and reused
+# Each DataFrame source becomes its own member file. Members are streamed into the
+# zip on disk one dataset at a time, so large exports never sit in memory whole.
+# ==============================
+
+import io
+import os
+import threading
+import time
+import zipfile
+
+import datasources
+from config import CACHE_DIR
+
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+
+# format -> (member extension, zip compression, download MIME type)
+FORMATS = {
+    "csv": (".csv", zipfile.ZIP_DEFLATED, "application/zip"),
+    "parquet": (".parquet", zipfile.ZIP_STORED, "application/zip"),  # Already compressed
+    "arrow": (".arrow", zipfile.ZIP_DEFLATED, "application/zip"),
+}
+
+
+def datasets():
+    """Names of the sources that hold tabular data."""
+    import pandas as pd
+    return [name for name in datasources.sources() if isinstance(datasources.get(name), pd.DataFrame)]
+
+
+def _write_member(zf, name, df, fmt, compression):
+    info = zipfile.ZipInfo(name + FORMATS[fmt][0], date_time=time.localtime()[:6])
+    info.compress_type = compression
+    with zf.open(info, "w", force_zip64=True) as fh:
+        if fmt == "csv":
+            with io.TextIOWrapper(fh, encoding="utf-8", newline="") as text:
+                df.to_csv(text, index=False)
+            return
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.PythonFile(fh, mode="w")
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, sink)
+        else:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def export_path(fmt="csv", names=None):
+    """Path of the export zip for the current data version, building it on first use."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+    names = datasets() if names is None else names
+    version = datasources.data_version(names)
+    path = os.path.join(EXPORT_DIR, f"ai_metrics_{version}_{fmt}.zip")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    compression = FORMATS[fmt][1]
+    with zipfile.ZipFile(tmp, "w") as zf:
+        for name in names:
+            _write_member(zf, name, datasources.get(name), fmt, compression)
+    os.replace(tmp, path)
+
+    # Drop exports of older data versions in this format
+    for old in os.listdir(EXPORT_DIR):
+        if old.endswith(f"_{fmt}.zip") and os.path.join(EXPORT_DIR, old) != path:
+            try:
+                os.remove(os.path.join(EXPORT_DIR, old))
+            except OSError:
+                pass
+    return path
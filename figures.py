@@ -0,0 +1,186 @@
+# ==============================
+# Figure Factory — pure chart builders + memoized serialized figures
+# Each builder takes (data, log_scale, height) and returns a fresh go.Figure.
+# figure() caches the figure JSON keyed on (name, data version, log_scale, height),
+# so a rerun only rebuilds charts whose inputs actually changed.
+# thin() bounds what a long line trace ships to the browser: points outside the
+# visible x range are dropped, the rest are LTTB-downsampled to MAX_POINTS, and
+# traces above GL_THRESHOLD render as WebGL (Scattergl).
+# ==============================
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+from plotly.subplots import make_subplots
+
+import instrumentation
+import metrics
+
+
+def apply_log(fig, log_scale):
+    if log_scale:
+        fig.update_yaxes(type="log")
+    return fig
+
+
+# ——— Long series: visible-range trim, LTTB downsampling, WebGL ———
+MAX_POINTS = 2000    # Per trace, after downsampling
+GL_THRESHOLD = 1000  # Source points above which a line trace renders as Scattergl
+
+
+def _numeric(values):
+    """Float positions for x values (numbers, dates or categories) — for area math only."""
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        return values.astype(float)
+    try:
+        return pd.to_datetime(values).asi8.astype(float)
+    except (ValueError, TypeError):
+        return np.arange(len(values), dtype=float)
+
+
+def lttb(x, y, n_out):
+    """Indices of the Largest-Triangle-Three-Buckets subset of (x, y); keeps first and last points."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(int), n)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()  # Next bucket's centroid
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = keep[i + 1] = lo + int(area.argmax())
+    return keep
+
+
+def _visible(xn, axis_range):
+    """Mask of points inside the axis range, plus one neighbour each side so lines reach the edges."""
+    lo, hi = _numeric(list(axis_range))
+    inside = (xn >= lo) & (xn <= hi)
+    return inside | np.roll(inside, 1) & (np.arange(len(xn)) > 0) | np.roll(inside, -1) & (np.arange(len(xn)) < len(xn) - 1)
+
+
+def thin(fig, max_points=MAX_POINTS, gl_threshold=GL_THRESHOLD):
+    """Bound every long line trace of `fig`; short figures come back untouched."""
+    if all(t.type != "scatter" or t.y is None or len(t.y) <= min(max_points, gl_threshold) for t in fig.data):
+        return fig
+    traces = []
+    for trace in fig.data:
+        if trace.type != "scatter" or trace.y is None or len(trace.y) <= min(max_points, gl_threshold):
+            traces.append(trace)
+            continue
+        x = np.asarray(trace.x) if trace.x is not None else np.arange(len(trace.y))
+        y = np.asarray(trace.y, dtype=float)
+        xn = _numeric(x)
+        mask = np.isfinite(y)
+        axis = fig.layout[(trace.xaxis or "x").replace("x", "xaxis", 1)]
+        if axis.range is not None:
+            mask &= _visible(xn, axis.range)
+        rows = np.flatnonzero(mask)
+        rows = rows[lttb(xn[rows], y[rows], max_points)]
+        props = trace.to_plotly_json()
+        props.pop("type")
+        props.update(x=x[rows], y=y[rows])
+        for key in ("text", "hovertext", "customdata"):
+            if isinstance(props.get(key), (list, tuple, np.ndarray)):
+                props[key] = np.asarray(props[key])[rows]
+        traces.append(go.Scattergl(props, skip_invalid=True) if len(trace.y) > gl_threshold else go.Scatter(props))
+        instrumentation.count("points_dropped", len(trace.y) - len(rows))
+    return go.Figure(data=traces, layout=fig.layout)
+
+
+# ——— Builders ———
+def build_rental(h100_rental, log_scale, height):
+    # H100 Rental Trend — Cleaner Labels & Expanded Range
+    fig_rental = go.Figure()
+    fig_rental.add_trace(go.Scatter(
+        name="H100 Rental $/GPU-hr (monthly avg)",
+        x=h100_rental["Month"],
+        y=h100_rental["Price"],
+        mode="lines+markers",
+        line=dict(color="#8B4513", width=6),
+        marker=dict(size=11)
+    ))
+
+    # Warnings with smaller font, further left
+    fig_rental.add_hline(y=0.60, line=dict(color="red", width=5, dash="dash"),
+        annotation_text="Energy $0.60", annotation_position="left", annotation_x=0.005, annotation_y=0.1, annotation_font=dict(color="red", size=10))
+    fig_rental.add_hline(y=1.65, line=dict(color="#FF8C00", width=5, dash="dash"),
+        annotation_text="Full-Cost $1.65", annotation_position="left", annotation_x=0.005, annotation_y=0.35, annotation_font=dict(color="#FF8C00", size=10))
+    fig_rental.add_hline(y=2.60, line=dict(color="#FFD700", width=5, dash="dash"),
+        annotation_text="Debt $2.60", annotation_position="left", annotation_x=0.005, annotation_y=0.6, annotation_font=dict(color="#B8860B", size=10))
+
+    fig_rental = apply_log(fig_rental, log_scale)
+    fig_rental.update_layout(
+        title="H100 Rental Cost Trend — Monthly (Chanos Signal + 3-Line Warning)",
+        height=height,
+        yaxis_title="$/GPU-hr",
+        yaxis=dict(range=[-0.5, 1]),  # Expanded focus: $0.3–$10
+        margin=dict(l=120, r=80, t=80, b=80)  # Balanced for ticks
+    )
+    return fig_rental
+
+
+def build_capex(historical_data, log_scale, height):
+    # CapEx vs Utilization Subplot
+    fig_capex = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_capex.add_trace(go.Bar(name="AI CapEx $B", x=historical_data["Quarter"], y=historical_data["AI_CapEx_B"], marker_color="orange"), secondary_y=False)
+    fig_capex.add_trace(go.Scatter(name="Utilization %", x=historical_data["Quarter"], y=historical_data["Utilization_pct"], mode="lines+markers", line=dict(width=5, color="purple")), secondary_y=True)
+    fig_capex = apply_log(fig_capex, log_scale)
+    fig_capex.update_layout(title="Hyperscaler CapEx vs Utilization (2023–2025)", height=height)
+    return fig_capex
+
+
+def build_deflation(deflation_data, log_scale, height):
+    # Deflation Dual-Lines
+    fig_deflation = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_deflation.add_trace(go.Scatter(name="Revenue/M Tokens", x=deflation_data["Quarter"], y=deflation_data["Revenue_per_M_Tokens"], mode="lines+markers", line=dict(color="green")), secondary_y=False)
+    fig_deflation.add_trace(go.Scatter(name="Cost/M Tokens", x=deflation_data["Quarter"], y=deflation_data["Cost_per_M_Tokens"], mode="lines+markers", line=dict(color="red")), secondary_y=True)
+    fig_deflation = apply_log(fig_deflation, log_scale)
+    fig_deflation.update_layout(title="Price Deflation Trend (Blended, 2022–2025)", height=height)
+    return fig_deflation
+
+
+def build_yoy_growth(deflation_data, log_scale, height):
+    # YoY Growth Rate Bar Chart (always linear)
+    growth = metrics.growth_pct(deflation_data["Revenue_per_M_Tokens"])
+    fig_yoy = go.Figure()
+    fig_yoy.add_trace(go.Bar(name="YoY Revenue Growth Rate (%)", x=deflation_data["Quarter"].iloc[1:], y=growth.iloc[1:], marker_color="purple"))
+    fig_yoy.add_hline(y=-30, line_dash="dash", line_color="red", annotation_text="-30% Deceleration Threshold", annotation_position="bottom right", annotation_font_size=12)
+    fig_yoy.update_layout(
+        title="YoY Revenue per M Tokens Growth Rate (Linear, 2023–2025 Q3)",
+        yaxis_title="Growth Rate (%)",
+        yaxis=dict(range=[-80, 0], tickmode="linear", dtick=10),
+        height=height,
+        showlegend=False
+    )
+    return fig_yoy
+
+
+BUILDERS = {
+    "rental": build_rental,
+    "capex": build_capex,
+    "deflation": build_deflation,
+    "yoy_growth": build_yoy_growth,
+}
+
+
+# ——— Memoized access ———
+@st.cache_data(max_entries=128, show_spinner=False)
+def figure_json(name, version, log_scale, height, _data):
+    """Serialized figure; `_data` is not hashed — `version` identifies it."""
+    instrumentation.count("cache_requests", cache="figure", figure=name, result="miss")
+    with instrumentation.span("figure_build", figure=name):
+        return thin(BUILDERS[name](_data, log_scale, height)).to_json()
+
+
+def figure(name, version, log_scale, height, data):
+    # Hits = requests - misses (st.cache_data doesn't report hits itself)
+    instrumentation.count("figure_requests", figure=name)
+    with instrumentation.span("figure_get", figure=name):
+        return pio.from_json(figure_json(name, version, log_scale, height, data))
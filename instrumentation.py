@@ -0,0 +1,179 @@
+# ==============================
+# Instrumentation — timing spans, counters and a Prometheus text dump
+# Spans feed fixed-bucket latency histograms keyed by (span name, labels);
+# counters track cache hits/misses and similar events. Everything is
+# process-wide and thread-safe so concurrent Streamlit sessions aggregate.
+#
+#   with instrumentation.span("http_fetch", provider=model): ...
+#   instrumentation.count("cache_requests", cache="source", source=n, result="hit")
+#   AI_DASHBOARD_METRICS_PORT=9464 streamlit run ai_dashboard.py  # GET /metrics
+# ==============================
+
+import bisect
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+PREFIX = "aidash"
+
+# Seconds; spans range from sub-ms cache hits to multi-second scrapes
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT = 512  # Durations kept per span series for percentile estimates
+
+_lock = threading.Lock()
+_hist = {}                  # (name, labels) -> [bucket counts..., +Inf count, sum]
+_recent = {}                # (name, labels) -> deque of recent durations
+_counters = defaultdict(float)  # (name, labels) -> value
+_server = None
+_serve_failed = False
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(name, seconds, **labels):
+    """Record one duration for span `name`."""
+    key = _key(name, labels)
+    with _lock:
+        hist = _hist.get(key)
+        if hist is None:
+            hist = _hist[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+            _recent[key] = deque(maxlen=RECENT)
+        hist[bisect.bisect_left(BUCKETS, seconds)] += 1
+        hist[-1] += seconds
+        _recent[key].append(seconds)
+
+
+@contextmanager
+def span(name, **labels):
+    """Time the enclosed block (also when it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def count(name, amount=1, **labels):
+    with _lock:
+        _counters[_key(name, labels)] += amount
+
+
+def reset():
+    with _lock:
+        _hist.clear()
+        _recent.clear()
+        _counters.clear()
+
+
+# ——— Readouts ———
+def span_summary():
+    """Rows of {span, labels, count, total_s, mean_ms, p50_ms, p95_ms, max_ms} for the debug panel."""
+    with _lock:
+        items = [(key, list(_hist[key]), sorted(_recent[key])) for key in _hist]
+    rows = []
+    for (name, labels), hist, recent in sorted(items):
+        n = sum(hist[:-1])
+
+        def pick(q):
+            return recent[min(len(recent) - 1, int(q * len(recent)))] * 1000
+
+        rows.append({
+            "span": name,
+            "labels": ", ".join(f"{k}={v}" for k, v in labels),
+            "count": n,
+            "total_s": round(hist[-1], 4),
+            "mean_ms": round(hist[-1] / n * 1000, 2) if n else None,
+            "p50_ms": round(pick(0.5), 2),
+            "p95_ms": round(pick(0.95), 2),
+            "max_ms": round(recent[-1] * 1000, 2),
+        })
+    return rows
+
+
+def counter_summary():
+    with _lock:
+        items = sorted(_counters.items())
+    return [{"counter": name, "labels": ", ".join(f"{k}={v}" for k, v in labels), "value": value}
+            for (name, labels), value in items]
+
+
+def _fmt_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def prometheus_text():
+    """Prometheus text exposition (version 0.0.4) of every span and counter."""
+    with _lock:
+        hists = sorted((key, list(value)) for key, value in _hist.items())
+        counters = sorted(_counters.items())
+    lines = []
+    metric = f"{PREFIX}_span_seconds"
+    lines.append(f"# HELP {metric} Duration of instrumented hot-path spans.")
+    lines.append(f"# TYPE {metric} histogram")
+    for (name, labels), hist in hists:
+        labels = (("span", name),) + labels
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), hist[:-1]):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{metric}_bucket{_fmt_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{metric}_sum{_fmt_labels(labels)} {hist[-1]:.6f}")
+        lines.append(f"{metric}_count{_fmt_labels(labels)} {cumulative}")
+
+    seen = set()
+    for (name, labels), value in counters:
+        metric = f"{PREFIX}_{name}_total"
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_fmt_labels(labels)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+# ——— Optional /metrics endpoint ———
+def serve(port, host="0.0.0.0"):
+    """Start (once per process) a background HTTP server exposing GET /metrics."""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _lock:
+        if _server is not None:
+            return _server
+        _server = ThreadingHTTPServer((host, port), Handler)
+        _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-endpoint", daemon=True).start()
+    return _server
+
+
+def serve_from_env():
+    """serve() on $AI_DASHBOARD_METRICS_PORT when it is set; no-op otherwise."""
+    global _serve_failed
+    port = os.environ.get("AI_DASHBOARD_METRICS_PORT")
+    if port and _server is None and not _serve_failed:
+        try:
+            serve(int(port))
+        except OSError:  # Another process already owns the port — don't retry every rerun
+            _serve_failed = True
@@ -0,0 +1,162 @@
+# ==============================
+# Market-Data Overlay — equity closes + realized volatility for the CDS canaries
+# A refresh re-fetches from each ticker's last stored bar (which may have been
+# stored mid-session and is overwritten if it changed) and appends only that bar
+# and newer ones to the time-series store (series "equity_<TICKER>"). Tickers
+# sharing a start date go in one batched download — all tickers with no history
+# share one HISTORY_START batch, kept apart from the incremental one — so refresh
+# cost scales with new bars, not with history or watchlist length.
+# The dashboard never waits on the network: load_overlay() serves the store and
+# refreshes on a background thread.
+#
+#   AI_DASHBOARD_WATCHLIST=CRWV,ORCL,NBIS,MSFT      # extend the watchlist
+#   AI_DASHBOARD_MARKET_PROVIDER=fixture            # offline (fixtures/market)
+# ==============================
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+import store
+
+log = logging.getLogger(__name__)
+
+WATCHLIST = [t.strip().upper() for t in os.environ.get("AI_DASHBOARD_WATCHLIST", "CRWV,ORCL,NBIS").split(",") if t.strip()]
+HISTORY_START = date(2025, 1, 1)  # First bar fetched for a ticker with nothing stored
+VOL_WINDOW = 20                   # Trading days in the realized-vol window
+REFRESH_INTERVAL = 15 * 60        # Min seconds between background refresh attempts
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "market", "synthetic_prices.csv")
+
+
+def series_name(ticker):
+    return f"equity_{ticker.upper()}"
+
+
+# ——— Providers: download(tickers, start) -> long frame [date, ticker, close, volume] ———
+class YFinanceProvider:
+    """All tickers in one yf.download call."""
+
+    def download(self, tickers, start):
+        import yfinance as yf
+        raw = yf.download(tickers, start=start.isoformat(), group_by="ticker", auto_adjust=True,
+                          threads=True, progress=False)
+        if raw is None or raw.empty:
+            return pd.DataFrame(columns=["date", "ticker", "close", "volume"])
+        if not isinstance(raw.columns, pd.MultiIndex):
+            raw.columns = pd.MultiIndex.from_product([tickers, raw.columns])
+        frames = []
+        for ticker in tickers:
+            if ticker not in raw.columns.get_level_values(0):
+                continue
+            bars = raw[ticker][["Close", "Volume"]].dropna(subset=["Close"])
+            frames.append(pd.DataFrame({"date": bars.index.tz_localize(None) if bars.index.tz else bars.index,
+                                        "ticker": ticker, "close": bars["Close"].to_numpy(),
+                                        "volume": bars["Volume"].to_numpy()}))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["date", "ticker", "close", "volume"])
+
+
+class FixtureProvider:
+    """Offline provider backed by a long-format CSV (date,ticker,close,volume)."""
+
+    def __init__(self, path=FIXTURE_PATH):
+        self.path = path
+        self.calls = 0
+
+    def download(self, tickers, start):
+        self.calls += 1
+        bars = pd.read_csv(self.path, parse_dates=["date"])
+        return bars[bars["ticker"].isin(tickers) & (bars["date"] >= pd.Timestamp(start))].reset_index(drop=True)
+
+
+def default_provider():
+    if os.environ.get("AI_DASHBOARD_MARKET_PROVIDER", "yfinance") == "fixture":
+        return FixtureProvider()
+    return YFinanceProvider()
+
+
+# ——— Incremental refresh ———
+def refresh(tickers=None, provider=None, today=None):
+    """Fetch bars from each ticker's last stored date, one batch per start date; returns {ticker: rows written}."""
+    tickers = WATCHLIST if tickers is None else [t.upper() for t in tickers]
+    today = today or date.today()
+    batches = defaultdict(list)  # start date -> tickers
+    for ticker in tickers:
+        last = store.last_date(series_name(ticker))
+        # Re-fetch the last stored day: it may hold an intraday price rather than the close
+        start = HISTORY_START if last is None else last.date()
+        if start <= today:
+            batches[start].append(ticker)
+
+    provider = provider or default_provider()
+    added = {t: 0 for t in tickers}
+    for start, group in sorted(batches.items()):
+        with instrumentation.span("market_download", tickers=len(group)):
+            bars = provider.download(sorted(group), start)
+        instrumentation.count("market_downloads")
+        for ticker, rows in bars.groupby("ticker"):
+            added[ticker] = store.append(series_name(ticker), rows.drop(columns="ticker"), replace_last=True)
+    return added
+
+
+_refresh_lock = threading.Lock()
+_last_attempt = 0.0
+
+
+def refresh_in_background():
+    """Start refresh() on a daemon thread unless one is running or ran within REFRESH_INTERVAL."""
+    global _last_attempt
+    if time.time() - _last_attempt < REFRESH_INTERVAL or not _refresh_lock.acquire(blocking=False):
+        return False
+    _last_attempt = time.time()
+
+    def run():
+        try:
+            refresh()
+        except Exception as e:  # Offline or provider error — keep serving what the store has
+            log.warning("market data refresh failed: %s", e)
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name="market-refresh", daemon=True).start()
+    return True
+
+
+def token(tickers=None):
+    """Change token over the watchlist's store series."""
+    return "|".join(store.version(series_name(t)) or "" for t in (WATCHLIST if tickers is None else tickers))
+
+
+def overlay(tickers=None, start=None, end=None):
+    """Wide frame with a date column plus <T>_close, <T>_rebased (first bar = 100), <T>_vol (annualized %)."""
+    tickers = WATCHLIST if tickers is None else tickers
+    # Read a little history before `start` so the vol window is full from the first row
+    warmup = None if start is None else pd.Timestamp(start) - timedelta(days=2 * VOL_WINDOW)
+    columns = {}
+    for ticker in tickers:
+        if store.version(series_name(ticker)) is None:
+            continue
+        bars = store.query(series_name(ticker), start=warmup, end=end, columns=["close"]).set_index("date")["close"]
+        vol = np.log(bars).diff().rolling(VOL_WINDOW).std() * np.sqrt(252) * 100
+        if start is not None:
+            bars, vol = bars[bars.index >= pd.Timestamp(start)], vol[vol.index >= pd.Timestamp(start)]
+        if bars.empty:
+            continue
+        columns[f"{ticker}_close"] = bars
+        columns[f"{ticker}_rebased"] = bars / bars.iloc[0] * 100
+        columns[f"{ticker}_vol"] = vol
+    frame = pd.DataFrame(columns)
+    frame.index.name = "date"
+    return frame.reset_index()
+
+
+def load_overlay(start=None, end=None):
+    """The data source loader: the overlay as stored now; new bars land via a background refresh."""
+    refresh_in_background()
+    return overlay(start=start, end=end)
@@ -0,0 +1,86 @@
+# ==============================
+# Metrics Engine — vectorized pandas/NumPy analytics
+# Every function accepts scalars, Series or whole DataFrames (one column per
+# series/issuer) and returns the same shape, so hundreds of issuers cost one call.
+# ==============================
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RECOVERY = 0.35
+
+
+def _as_float(values):
+    """Scalars pass through; lists/arrays become a float Series (None -> NaN)."""
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return values.astype(float)
+    if values is None or np.isscalar(values):
+        return np.nan if values is None else float(values)
+    return pd.Series(values, dtype=float)
+
+
+def growth_pct(values, periods=1):
+    """Period-over-period % change (NaN for the first `periods` rows; NaN for a scalar)."""
+    values = _as_float(values)
+    if not isinstance(values, (pd.Series, pd.DataFrame)):
+        return np.nan
+    return values.pct_change(periods=periods, fill_method=None) * 100
+
+
+def margin_ratio(revenue, cost):
+    """Revenue / cost; zero or missing cost gives NaN instead of inf."""
+    cost = _as_float(cost)
+    if isinstance(cost, (pd.Series, pd.DataFrame)):
+        cost = cost.where(cost != 0)
+    elif cost == 0:
+        cost = np.nan
+    return _as_float(revenue) / cost
+
+
+def hazard_rate(spreads_bps, recovery=DEFAULT_RECOVERY):
+    """Annual default intensity implied by a CDS spread: s / (1 - R).
+
+    Non-positive or missing spreads give NaN.
+    """
+    s = _as_float(spreads_bps)
+    if isinstance(s, (pd.Series, pd.DataFrame)):
+        s = s.where(s > 0)
+    elif not s > 0:
+        s = np.nan
+    return (s / 10000) / (1 - recovery)
+
+
+def cumulative_default_probability(spreads_bps, tenors=5, recovery=DEFAULT_RECOVERY, compounding="annual"):
+    """Cumulative probability of default by each tenor (in years), as a fraction.
+
+    compounding="annual" uses 1 - (1 - h)^T (the dashboard's original convention);
+    "continuous" uses 1 - exp(-h T). A scalar tenor keeps the input shape; a tenor
+    grid adds a level: Series -> DataFrame (columns = tenors), DataFrame ->
+    columns MultiIndex (issuer, tenor).
+    """
+    h = hazard_rate(spreads_bps, recovery)
+    grid = np.atleast_1d(np.asarray(tenors, dtype=float))
+
+    def _pd(values):
+        values = np.asarray(values, dtype=float)[..., np.newaxis]
+        if compounding == "annual":
+            return 1 - (1 - np.clip(values, 0, 1)) ** grid
+        if compounding == "continuous":
+            return 1 - np.exp(-values * grid)
+        raise ValueError(f"Unknown compounding: {compounding!r}")
+
+    out = _pd(h)
+    if np.ndim(tenors) == 0:
+        out = out[..., 0]
+        if isinstance(h, pd.DataFrame):
+            return pd.DataFrame(out, index=h.index, columns=h.columns)
+        if isinstance(h, pd.Series):
+            return pd.Series(out, index=h.index, name=h.name)
+        return float(out)
+
+    if isinstance(h, pd.DataFrame):
+        columns = pd.MultiIndex.from_product([h.columns, grid], names=[h.columns.name or "issuer", "tenor"])
+        return pd.DataFrame(out.reshape(len(h), -1), index=h.index, columns=columns)
+    if isinstance(h, pd.Series):
+        return pd.DataFrame(out, index=h.index, columns=pd.Index(grid, name="tenor"))
+    return pd.Series(out, index=pd.Index(grid, name="tenor"))
@@ -0,0 +1,239 @@
+# ==============================
+# Pricing Scrape — concurrent fetch of provider pricing pages
+# One pooled keep-alive session, per-provider timeouts, overall deadline.
+# Requests are conditional (ETag / If-Modified-Since); a 304 reuses the last
+# parsed prices without touching the parser. Otherwise only <table> elements
+# are parsed (lxml + SoupStrainer) and per-provider rules pick the prices.
+# Providers that fail or miss the deadline fall back to their last known price.
+# ==============================
+
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+import config
+import instrumentation
+
+# Current flagships; AI_DASHBOARD_PRICING_URLS (JSON {model: url}) overrides, e.g. for benchmarks
+PRICING_URLS = {
+    "OpenAI (GPT-4o)": "https://openai.com/api/pricing/",
+    "Google (Gemini 2.5 Pro)": "https://cloud.google.com/vertex-ai/pricing",
+    "Anthropic (Claude 3.5 Sonnet)": "https://www.anthropic.com/pricing",
+    "xAI (Grok-4)": "https://x.ai/api/pricing",
+}
+if os.environ.get("AI_DASHBOARD_PRICING_URLS"):
+    PRICING_URLS = json.loads(os.environ["AI_DASHBOARD_PRICING_URLS"])
+
+# (connect, read) seconds per provider; anything not listed uses DEFAULT_TIMEOUT
+DEFAULT_TIMEOUT = (3.05, 5)
+PROVIDER_TIMEOUTS = {}
+
+# Whole fetch stage must finish within this many seconds
+FETCH_DEADLINE = 6.0
+
+# Last known $/M prices per model (seeded with the demo fallback values)
+DEFAULT_PRICES = {
+    "OpenAI (GPT-4o)": (0.15, 0.60),
+    "Google (Gemini 2.5 Pro)": (0.35, 1.05),
+    "Anthropic (Claude 3.5 Sonnet)": (3.00, 15.00),
+    "xAI (Grok-4)": (3.00, 15.00),
+}
+
+# Per-model state: {"url", "prices", "etag", "last_modified"}; persisted next to the source cache
+_state = None
+_state_lock = threading.Lock()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared keep-alive session, pooled for one connection per provider."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=len(PRICING_URLS), pool_maxsize=len(PRICING_URLS))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = "ai-profit-dashboard/3.1"
+            _session = session
+        return _session
+
+
+# ——— Extraction rules ———
+class ExtractionError(ValueError):
+    """A pricing page didn't contain what the provider's rule expects."""
+
+
+# row: regex matched against a table row's first cell; input/output: regexes matched
+# against header cells to locate the price columns; scale: multiplier to $ per 1M tokens
+Rule = namedtuple("Rule", ["row", "input", "output", "scale"])
+
+EXTRACTION_RULES = {
+    "OpenAI (GPT-4o)": Rule(r"^gpt-4o$", r"input", r"output", 1.0),
+    "Google (Gemini 2.5 Pro)": Rule(r"^gemini 2\.5 pro\b", r"input", r"output", 1.0),
+    "Anthropic (Claude 3.5 Sonnet)": Rule(r"^claude (3\.5 sonnet|sonnet 3\.5)\b", r"input", r"output", 1.0),
+    "xAI (Grok-4)": Rule(r"^grok-4\b", r"input", r"output", 1.0),
+}
+
+_PRICE = re.compile(r"\$\s*([0-9]+(?:\.[0-9]+)?)")
+
+
+def _price(text, scale):
+    match = _PRICE.search(text)
+    if match is None:
+        raise ExtractionError(f"no $ amount in {text!r}")
+    return round(float(match.group(1)) * scale, 6)
+
+
+def _parse_tables(html):
+    """Parse only the page's <table> elements (lxml when available)."""
+    from bs4 import BeautifulSoup, SoupStrainer
+    try:
+        import lxml  # noqa: F401
+        features = "lxml"
+    except ImportError:
+        features = "html.parser"
+    return BeautifulSoup(html, features, parse_only=SoupStrainer("table")).find_all("table")
+
+
+def extract_prices(model, html):
+    """Pull (input $/M, output $/M) for `model` from a pricing page using its rule."""
+    rule = EXTRACTION_RULES.get(model)
+    if rule is None:
+        raise ExtractionError(f"no extraction rule for {model}")
+    row_re = re.compile(rule.row, re.I)
+    for table in _parse_tables(html):
+        rows = table.find_all("tr")
+        if not rows:
+            continue
+        headers = [c.get_text(" ", strip=True) for c in rows[0].find_all(["th", "td"])]
+        col_in = next((i for i, h in enumerate(headers) if re.search(rule.input, h, re.I)), None)
+        col_out = next((i for i, h in enumerate(headers) if re.search(rule.output, h, re.I)), None)
+        if col_in is None or col_out is None:
+            continue
+        for row in rows[1:]:
+            cells = [c.get_text(" ", strip=True) for c in row.find_all(["th", "td"])]
+            if len(cells) > max(col_in, col_out) and row_re.search(cells[0]):
+                return _price(cells[col_in], rule.scale), _price(cells[col_out], rule.scale)
+    raise ExtractionError(f"{model}: no matching price row")
+
+
+# ——— Conditional-GET state ———
+def _state_path():
+    return os.path.join(config.CACHE_DIR, "pricing_state.json")
+
+
+def _load_state():
+    global _state
+    if _state is None:
+        try:
+            with open(_state_path(), encoding="utf-8") as f:
+                _state = json.load(f)
+        except (OSError, ValueError):
+            _state = {}
+    return _state
+
+
+def _save_state():
+    path = _state_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_state, f, indent=1)
+    os.replace(tmp, path)
+
+
+def reset_state():
+    """Forget validators and last known prices (next fetch is unconditional)."""
+    global _state
+    with _state_lock:
+        _state = {}
+        _save_state()
+
+
+def last_known(model):
+    with _state_lock:
+        entry = _load_state().get(model)
+    return tuple(entry["prices"]) if entry and entry.get("prices") else DEFAULT_PRICES.get(model, (0.15, 0.60))
+
+
+def _fetch_one(session, model, url, cached):
+    """Returns the new state entry for `model`."""
+    headers = {}
+    if cached and cached.get("url") == url and cached.get("prices"):
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    with instrumentation.span("http_fetch", provider=model):
+        resp = session.get(url, headers=headers, timeout=PROVIDER_TIMEOUTS.get(model, DEFAULT_TIMEOUT))
+    instrumentation.count("http_responses", provider=model, status=resp.status_code)
+    if resp.status_code == 304:
+        return cached  # Unchanged — skip download and parse
+    resp.raise_for_status()
+    with instrumentation.span("price_extract", provider=model):
+        prices = extract_prices(model, resp.text)
+    return {"url": url, "prices": list(prices),
+            "etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+
+
+def fetch_pricing(urls=None, deadline=FETCH_DEADLINE):
+    """Fetch all pricing pages concurrently; returns a DataFrame in `urls` order."""
+    urls = PRICING_URLS if urls is None else urls
+    session = get_session()
+    pool = ThreadPoolExecutor(max_workers=max(len(urls), 1), thread_name_prefix="pricing")
+    with _state_lock:
+        state = dict(_load_state())
+    futures = {model: pool.submit(_fetch_one, session, model, url, state.get(model)) for model, url in urls.items()}
+    with instrumentation.span("pricing_fetch_stage"):
+        wait(futures.values(), timeout=deadline)
+    # Don't block on stragglers — their own read timeout bounds them
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    pricing_data = []
+    updates = {}
+    for model, future in futures.items():
+        if future.done() and not future.cancelled() and future.exception() is None:
+            entry = future.result()
+            if entry is not state.get(model):
+                updates[model] = entry
+            prices = entry["prices"]
+        else:
+            instrumentation.count("pricing_fallbacks", provider=model, reason="deadline" if not future.done() else "error")
+            prices = last_known(model)
+        pricing_data.append({"Model": model, "Input $/M": prices[0], "Output $/M": prices[1]})
+    if updates:
+        with _state_lock:
+            _load_state().update(updates)
+            _save_state()
+    return pd.DataFrame(pricing_data)
+
+
+def check_fixtures(fixture_dir):
+    """Run the extraction rules over saved pages listed in <fixture_dir>/expected.json.
+
+    Returns rows of (model, file, expected, got or error message, ok).
+    """
+    with open(os.path.join(fixture_dir, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    results = []
+    for model, spec in expected.items():
+        want = (spec["input"], spec["output"])
+        with open(os.path.join(fixture_dir, spec["file"]), encoding="utf-8") as f:
+            html = f.read()
+        try:
+            got = extract_prices(model, html)
+        except ExtractionError as e:
+            results.append((model, spec["file"], want, str(e), False))
+            continue
+        results.append((model, spec["file"], want, got, tuple(got) == tuple(want)))
+    return results
@@ -0,0 +1,156 @@
+# ==============================
+# Scenario Engine — vectorized Monte Carlo for H100 rental breakeven and credit risk
+# Paths are simulated as (n_paths, steps) NumPy arrays of geometric Brownian motion.
+# Work can be split into independently seeded chunks across a process pool; each
+# chunk returns sufficient statistics (hit counts, summed crossing times, quantiles)
+# that are merged here. Results are memoized per parameter set.
+#
+#   AI_DASHBOARD_MC_WORKERS=4   # default process-pool size (0/1 = in-process)
+# ==============================
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Horizontal warning lines on the H100 rental chart ($/GPU-hr)
+BREAKEVEN_LINES = (("Debt", 2.60), ("Full-Cost", 1.65), ("Energy", 0.60))
+STEPS_PER_YEAR = 12
+FAN_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DEFAULT_WORKERS = int(os.environ.get("AI_DASHBOARD_MC_WORKERS", "0"))
+
+# drift/vol are annualized, in log terms (e.g. drift=-0.3 ≈ -26%/yr median decline)
+RentalParams = namedtuple("RentalParams", ["start", "drift", "vol", "years", "n_paths", "seed"])
+CreditParams = namedtuple("CreditParams", ["spread_bps", "drift", "vol", "recovery", "years", "n_paths", "seed", "distress_bps"])
+
+
+def calibrate(dates, values):
+    """(annual log drift, annual log vol) from an irregularly spaced series."""
+    t = (pd.to_datetime(pd.Series(dates)) - pd.Timestamp(pd.Series(dates).iloc[0])).dt.days.to_numpy() / 365.25
+    logv = np.log(np.asarray(values, dtype=float))
+    drift = np.polyfit(t, logv, 1)[0]
+    dt = np.diff(t)
+    residual = np.diff(logv) - drift * dt
+    vol = np.sqrt(np.mean(residual ** 2 / dt)) if len(dt) else 0.0
+    return float(drift), float(vol)
+
+
+def simulate_gbm(start, drift, vol, years, n_paths, rng, steps_per_year=STEPS_PER_YEAR):
+    """(n_paths, steps + 1) array of GBM paths starting at `start`."""
+    steps = int(round(years * steps_per_year))
+    dt = 1.0 / steps_per_year
+    log_steps = (drift - 0.5 * vol ** 2) * dt + vol * np.sqrt(dt) * rng.standard_normal((n_paths, steps))
+    paths = np.empty((n_paths, steps + 1))
+    paths[:, 0] = start
+    paths[:, 1:] = start * np.exp(np.cumsum(log_steps, axis=1))
+    return paths
+
+
+def first_crossing(paths, thresholds, below=True):
+    """(crossed, first_step) per threshold x path; step 0 means already through the line."""
+    levels = np.asarray(thresholds, dtype=float)[:, None, None]
+    hit = paths[None] <= levels if below else paths[None] >= levels
+    crossed = hit.any(axis=2)
+    return crossed, np.where(crossed, hit.argmax(axis=2), 0)
+
+
+# ——— Chunk workers (top-level so a process pool can pickle them) ———
+def _rental_chunk(params, seed, n_paths, levels):
+    rng = np.random.default_rng(seed)
+    paths = simulate_gbm(params.start, params.drift, params.vol, params.years, n_paths, rng)
+    crossed, step = first_crossing(paths, levels, below=True)
+    return {
+        "n": n_paths,
+        "hits": crossed.sum(axis=1),
+        "time_sum": step.sum(axis=1) / STEPS_PER_YEAR,
+        "quantiles": np.quantile(paths, FAN_QUANTILES, axis=0),
+    }
+
+
+def _credit_chunk(params, seed, n_paths):
+    rng = np.random.default_rng(seed)
+    spreads = simulate_gbm(params.spread_bps, params.drift, params.vol, params.years, n_paths, rng)
+    dt = 1.0 / STEPS_PER_YEAR
+    # Cumulative hazard along each path; default when it exceeds an Exp(1) draw
+    hazard = spreads[:, 1:] / 10000 / (1 - params.recovery)  # metrics.hazard_rate, path-wise
+    cum_hazard = np.cumsum(hazard * dt, axis=1)
+    exp_draws = rng.exponential(size=(n_paths, 1))
+    defaulted = cum_hazard >= exp_draws
+    did_default = defaulted.any(axis=1)
+    default_step = defaulted.argmax(axis=1) + 1
+    crossed, distress_step = first_crossing(spreads, [params.distress_bps], below=False)
+    return {
+        "n": n_paths,
+        "pd_sum": (1 - np.exp(-cum_hazard[:, -1])).sum(),  # Expected PD (Rao-Blackwellized)
+        "pd_quantiles": np.quantile(1 - np.exp(-cum_hazard[:, -1]), FAN_QUANTILES),
+        "defaults": did_default.sum(),
+        "default_time_sum": (default_step * did_default).sum() / STEPS_PER_YEAR,
+        "distress_hits": crossed[0].sum(),
+        "distress_time_sum": distress_step[0].sum() / STEPS_PER_YEAR,
+        "quantiles": np.quantile(spreads, FAN_QUANTILES, axis=0),
+    }
+
+
+def _run_chunks(worker, params, n_paths, workers, *extra):
+    """Split `n_paths` into independently seeded chunks, optionally across processes."""
+    chunks = max(workers, 1)
+    sizes = [n_paths // chunks + (i < n_paths % chunks) for i in range(chunks)]
+    seeds = np.random.SeedSequence(params.seed).spawn(chunks)
+    args = [(params, seed, size) + extra for seed, size in zip(seeds, sizes) if size]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(worker, *zip(*args)))
+    return [worker(*a) for a in args]
+
+
+def _merge_quantiles(results, key):
+    # Size-weighted mean of per-chunk quantiles — exact for one chunk, close for large chunks
+    weights = np.array([r["n"] for r in results], dtype=float)
+    return np.tensordot(weights / weights.sum(), np.stack([r[key] for r in results]), axes=1)
+
+
+def _fan(quantiles, years):
+    steps = quantiles.shape[1]
+    fan = pd.DataFrame(quantiles.T, columns=[f"p{int(q * 100)}" for q in FAN_QUANTILES])
+    fan.insert(0, "years", np.arange(steps) / STEPS_PER_YEAR)
+    return fan
+
+
+# ——— Public, memoized per parameter set ———
+@lru_cache(maxsize=64)
+def rental_breakeven(params, lines=BREAKEVEN_LINES, workers=DEFAULT_WORKERS):
+    """Probability and expected time (years, given a crossing) of the rental price
+    falling through each breakeven line, plus percentile fan data."""
+    levels = tuple(level for _, level in lines)
+    results = _run_chunks(_rental_chunk, params, params.n_paths, workers, levels)
+    n = sum(r["n"] for r in results)
+    hits = sum(r["hits"] for r in results)
+    time_sum = sum(r["time_sum"] for r in results)
+    table = pd.DataFrame({
+        "Line": [name for name, _ in lines],
+        "$/GPU-hr": levels,
+        "P(cross)": hits / n,
+        "Expected years to cross": np.where(hits > 0, time_sum / np.maximum(hits, 1), np.nan),
+    })
+    return {"table": table, "fan": _fan(_merge_quantiles(results, "quantiles"), params.years)}
+
+
+@lru_cache(maxsize=64)
+def credit_risk(params, workers=DEFAULT_WORKERS):
+    """Default probability distribution and distress-threshold crossing for one issuer."""
+    results = _run_chunks(_credit_chunk, params, params.n_paths, workers)
+    n = sum(r["n"] for r in results)
+    defaults = sum(r["defaults"] for r in results)
+    distress = sum(r["distress_hits"] for r in results)
+    pd_q = _merge_quantiles(results, "pd_quantiles")
+    return {
+        "pd_mean": sum(r["pd_sum"] for r in results) / n,
+        "pd_p5": pd_q[0], "pd_p95": pd_q[-1],
+        "expected_years_to_default": sum(r["default_time_sum"] for r in results) / defaults if defaults else np.nan,
+        "p_distress": distress / n,
+        "expected_years_to_distress": sum(r["distress_time_sum"] for r in results) / distress if distress else np.nan,
+        "fan": _fan(_merge_quantiles(results, "quantiles"), params.years),
+    }
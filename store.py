@@ -0,0 +1,221 @@
+# ==============================
+# Time-Series Store — append-only, columnar, partitioned by series
+# Layout: <STORE_DIR>/<series>/part-<ns timestamp>.parquet, one file per ingest.
+# Every part has a `date` column (plus an optional display `label`); ingest only
+# appends rows newer than the series' last stored date. Reads are memory-mapped
+# and filtered by date range, so memory tracks the queried window, not history.
+#
+#   python store.py ingest cds_spreads new_rows.csv
+#   python store.py seed            # load data/seed/*.csv into an empty store
+#   python store.py compact h100_rental
+# ==============================
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.environ.get("AI_DASHBOARD_STORE_DIR", os.path.join(BASE_DIR, "data", "store"))
+SEED_DIR = os.path.join(BASE_DIR, "data", "seed")
+MAX_PARTS = 32  # append() compacts a series once it has more parts than this
+
+
+def _pq():
+    # pyarrow loads only when a code path actually reads or writes Parquet
+    import pyarrow.parquet as pq
+    return pq
+
+
+def _series_dir(series):
+    return os.path.join(STORE_DIR, series)
+
+
+def _parts(series):
+    path = _series_dir(series)
+    if not os.path.isdir(path):
+        return []
+    return sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".parquet"))
+
+
+def list_series():
+    if not os.path.isdir(STORE_DIR):
+        return []
+    return sorted(d for d in os.listdir(STORE_DIR) if _parts(d))
+
+
+def version(series):
+    """Cheap change token for a series — the newest part file name."""
+    parts = _parts(series)
+    return os.path.basename(parts[-1]) if parts else None
+
+
+def last_date(series):
+    """Latest stored date, read from Parquet footer statistics (no data pages)."""
+    pq = _pq()
+    latest = None
+    for part in _parts(series):
+        meta = pq.ParquetFile(part, memory_map=True).metadata
+        col = meta.schema.to_arrow_schema().get_field_index("date")
+        for i in range(meta.num_row_groups):
+            stats = meta.row_group(i).column(col).statistics
+            if stats is None or not stats.has_min_max:
+                # No statistics — fall back to scanning the column
+                value = pq.read_table(part, columns=["date"], memory_map=True)["date"].to_pandas().max()
+            else:
+                value = pd.Timestamp(stats.max)
+            if latest is None or value > latest:
+                latest = value
+    return latest
+
+
+def _schema(parts):
+    """One schema for all parts, from footers only; a column that is integer in one part
+    and floating-point in another is promoted to float64."""
+    import pyarrow as pa
+    pq = _pq()
+    fields = {}
+    for part in parts:
+        for field in pq.read_schema(part, memory_map=True):
+            seen = fields.get(field.name)
+            if seen is None:
+                fields[field.name] = field
+            elif seen.type != field.type and {pa.types.is_integer(t) or pa.types.is_floating(t) for t in (seen.type, field.type)} == {True}:
+                fields[field.name] = pa.field(field.name, pa.float64())
+    return pa.schema(list(fields.values()))
+
+
+def _matches_stored(series, row):
+    """True when the stored row for row["date"] already holds the same values."""
+    stored = query(series, start=row["date"], end=row["date"])
+    if stored.empty or not set(row.index) <= set(stored.columns):
+        return False
+    old = stored.iloc[-1]
+    return all(old[c] == row[c] or (pd.isna(old[c]) and pd.isna(row[c])) for c in row.index)
+
+
+def append(series, df, replace_last=False):
+    """Append observations newer than the series' last date; returns rows added.
+
+    With `replace_last`, a row dated on the last stored date supersedes it (e.g. a
+    bar first stored while the session was still open) — reads keep the newest part's
+    row. An unchanged re-fetch of that row writes nothing. Series past MAX_PARTS parts
+    are compacted so reads don't slow down as refreshes accumulate.
+    """
+    if "date" not in df.columns:
+        raise ValueError(f"{series}: ingest frame needs a 'date' column")
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"])
+    latest = last_date(series)
+    if latest is not None:
+        df = df[df["date"] >= latest] if replace_last else df[df["date"] > latest]
+    df = df.drop_duplicates("date", keep="last").sort_values("date")
+    if replace_last and not df.empty and df["date"].iloc[0] == latest and _matches_stored(series, df.iloc[0]):
+        df = df.iloc[1:]
+    if df.empty:
+        return 0
+
+    import pyarrow as pa
+    pq = _pq()
+    os.makedirs(_series_dir(series), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Match the stored column types where the values allow it (120.0 -> int64); otherwise
+    # keep the new type (700.5 stays double) and let _schema() promote the column on read
+    existing = _schema(_parts(series))
+    for i, field in enumerate(table.schema):
+        target = existing.field(field.name) if field.name in existing.names else None
+        if target is not None and target.type != field.type:
+            try:
+                table = table.set_column(i, target.name, table.column(i).cast(target.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                pass
+    final = os.path.join(_series_dir(series), f"part-{time.time_ns()}.parquet")
+    tmp = final + ".tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, final)  # Readers never see a half-written part
+    if len(_parts(series)) > MAX_PARTS:
+        compact(series)
+    return len(df)
+
+
+def query(series, start=None, end=None, columns=None):
+    """Rows of `series` with start <= date <= end (either bound optional), sorted by date."""
+    parts = _parts(series)
+    if not parts:
+        raise KeyError(f"Unknown series: {series}")
+    filters = []
+    if start is not None:
+        filters.append(("date", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("date", "<=", pd.Timestamp(end)))
+    if columns is not None:
+        columns = ["date"] + [c for c in columns if c != "date"]
+    table = _pq().read_table(parts, schema=_schema(parts), columns=columns, filters=filters or None, memory_map=True)
+    # keep="last" also hides the brief overlap while compact() swaps parts
+    return table.to_pandas().drop_duplicates("date", keep="last").sort_values("date", ignore_index=True)
+
+
+def compact(series):
+    """Rewrite all parts of `series` into one file (superseded rows dropped)."""
+    parts = _parts(series)
+    if len(parts) < 2:
+        return
+    import pyarrow as pa
+    pq = _pq()
+    schema = _schema(parts)
+    rows = pq.read_table(parts, schema=schema, memory_map=True).to_pandas()
+    rows = rows.drop_duplicates("date", keep="last").sort_values("date")
+    table = pa.Table.from_pandas(rows, schema=schema, preserve_index=False)
+    final = os.path.join(_series_dir(series), f"part-{time.time_ns()}.parquet")
+    tmp = final + ".tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, final)
+    for part in parts:
+        os.remove(part)
+
+
+def ingest_csv(series, path):
+    return append(series, pd.read_csv(path))
+
+
+def seed(only_missing=True):
+    """Load the bundled data/seed/<series>.csv files; returns {series: rows added}."""
+    added = {}
+    for name in sorted(os.listdir(SEED_DIR)):
+        if not name.endswith(".csv"):
+            continue
+        series = name[:-len(".csv")]
+        if only_missing and _parts(series):
+            continue
+        added[series] = ingest_csv(series, os.path.join(SEED_DIR, name))
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI dashboard time-series store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="append new observations from a CSV with a 'date' column")
+    p_ingest.add_argument("series")
+    p_ingest.add_argument("csv")
+    sub.add_parser("seed", help="load bundled seed CSVs for series not yet in the store")
+    p_compact = sub.add_parser("compact", help="merge a series' parts into one file")
+    p_compact.add_argument("series")
+    sub.add_parser("list", help="show series, part counts and last dates")
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        seed()  # A fresh store starts from the bundled history, not just the new rows
+        print(f"{args.series}: +{ingest_csv(args.series, args.csv)} rows")
+    elif args.command == "seed":
+        for series, rows in seed().items():
+            print(f"{series}: +{rows} rows")
+    elif args.command == "compact":
+        compact(args.series)
+    elif args.command == "list":
+        for series in list_series():
+            print(f"{series}\t{len(_parts(series))} parts\tlast={last_date(series):%Y-%m-%d}")
+
+
+if __name__ == "__main__":
+    main()
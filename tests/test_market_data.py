@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+import market_data
+import store
+
+BARS = pd.read_csv(market_data.FIXTURE_PATH, parse_dates=["date"])
+TODAY = BARS["date"].max().date()
+
+
+class RecordingProvider(market_data.FixtureProvider):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def download(self, tickers, start):
+        self.batches.append((tuple(tickers), start))
+        return super().download(tickers, start)
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path))
+    return RecordingProvider()
+
+
+def _parts(ticker):
+    return len(store._parts(market_data.series_name(ticker)))
+
+
+def test_one_download_per_refresh(provider):
+    market_data.refresh(["CRWV", "ORCL"], provider=provider, today=TODAY)
+    assert provider.batches == [(("CRWV", "ORCL"), market_data.HISTORY_START)]
+    assert len(store.query("equity_CRWV")) == (BARS["ticker"] == "CRWV").sum()
+
+
+def test_unchanged_refresh_writes_nothing(provider):
+    market_data.refresh(["CRWV", "ORCL"], provider=provider, today=TODAY)
+    token = market_data.token(["CRWV", "ORCL"])
+    for _ in range(3):
+        assert market_data.refresh(["CRWV", "ORCL"], provider=provider, today=TODAY) == {"CRWV": 0, "ORCL": 0}
+    assert len(provider.batches) == 4  # Still one download per refresh
+    assert (_parts("CRWV"), _parts("ORCL")) == (1, 1)
+    assert market_data.token(["CRWV", "ORCL"]) == token
+
+
+def test_intraday_last_bar_is_replaced(provider):
+    bars = BARS[BARS["ticker"] == "CRWV"].drop(columns="ticker")
+    provisional = bars.copy()
+    provisional.loc[provisional.index[-1], "close"] = -1.0
+    store.append("equity_CRWV", provisional)
+
+    assert market_data.refresh(["CRWV"], provider=provider, today=TODAY) == {"CRWV": 1}
+    assert provider.batches == [(("CRWV",), TODAY)]
+    assert store.query("equity_CRWV")["close"].iloc[-1] == bars["close"].iloc[-1]
+
+
+def test_new_ticker_gets_its_own_batch(provider):
+    market_data.refresh(["CRWV", "ORCL"], provider=provider, today=TODAY)
+    provider.batches.clear()
+    market_data.refresh(["CRWV", "ORCL", "NBIS"], provider=provider, today=TODAY)
+    assert sorted(provider.batches) == sorted([(("NBIS",), market_data.HISTORY_START), (("CRWV", "ORCL"), TODAY)])
+    assert (_parts("CRWV"), _parts("ORCL")) == (1, 1)
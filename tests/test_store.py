@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+import store
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_fractional_append_to_integer_series(store_dir):
+    store.append("cds_spreads", pd.DataFrame({"date": ["2025-09-30"], "label": ["Q3 2025"], "CRWV": [700], "ORCL": [120], "NBIS": [460]}))
+    store.append("cds_spreads", pd.DataFrame({"date": ["2025-12-31"], "label": ["2025-Dec"], "CRWV": [700.5], "ORCL": [120], "NBIS": [460]}))
+
+    rows = store.query("cds_spreads")
+    assert rows["CRWV"].tolist() == [700.0, 700.5]
+    assert rows["CRWV"].dtype == "float64"
+    assert store.query("cds_spreads", start="2025-10-01")["CRWV"].tolist() == [700.5]
+
+    store.compact("cds_spreads")
+    assert store.query("cds_spreads")["CRWV"].tolist() == [700.0, 700.5]
+
+
+def test_integral_floats_keep_integer_column(store_dir):
+    store.append("s", pd.DataFrame({"date": ["2025-01-01"], "v": [1]}))
+    store.append("s", pd.DataFrame({"date": ["2025-02-01"], "v": [2.0]}))
+    rows = store.query("s")
+    assert rows["v"].dtype == "int64"
+    assert rows["v"].tolist() == [1, 2]
+
+
+def test_appends_past_max_parts_compact(store_dir, monkeypatch):
+    monkeypatch.setattr(store, "MAX_PARTS", 3)
+    for month in range(1, 6):
+        store.append("s", pd.DataFrame({"date": [f"2025-{month:02d}-01"], "v": [month]}))
+    store.append("s", pd.DataFrame({"date": ["2025-05-01"], "v": [50]}), replace_last=True)
+    assert len(store._parts("s")) <= 3
+    assert store.query("s")["v"].tolist() == [1, 2, 3, 4, 50]